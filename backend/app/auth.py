@@ -0,0 +1,17 @@
+import hmac
+import os
+
+from fastapi import Header, HTTPException
+
+
+async def require_admin(authorization: str = Header(None)):
+    """
+    Guards the admin routes with the CRON_SECRET shared secret, sent the way Vercel Cron
+    sends it: "Authorization: Bearer <CRON_SECRET>". Without the secret they stay closed.
+    """
+    secret = os.getenv("CRON_SECRET")
+    if not secret:
+        raise HTTPException(status_code=503, detail="Admin routes are disabled: CRON_SECRET is not set")
+    expected = f"Bearer {secret}".encode()
+    if not authorization or not hmac.compare_digest(authorization.encode(), expected):
+        raise HTTPException(status_code=401, detail="Unauthorized")
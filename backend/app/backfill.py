@@ -0,0 +1,170 @@
+import asyncio
+import time
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from app.cache import response_cache
+from app.database import collection, state_collection
+from app.india_lottery_api import fetch_api_history
+from app.ingest import LEGACY_FIELDS, build_document
+from app.prize_schema import document_tiers
+from app.stats import rebuild_stats_rollups
+
+BACKFILL_STATE_ID = "backfill"
+
+PAGE_SIZE = 50
+CONCURRENCY = 4            # history pages in flight at once
+REQUESTS_PER_SECOND = 5.0  # politeness limit towards IndiaLotteryAPI
+MAX_PAGE_ATTEMPTS = 3
+
+# Live progress of the current (or last) run, served by the admin endpoint
+backfill_progress = {"running": False}
+
+
+class RateLimiter:
+    """Spaces out calls so at most `rate` start per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def _fetch_page(offset: int, page_size: int, semaphore: asyncio.Semaphore, limiter: RateLimiter):
+    async with semaphore:
+        for attempt in range(MAX_PAGE_ATTEMPTS):
+            await limiter.wait()
+            result = await fetch_api_history(limit=page_size, offset=offset)
+            if result.get("status") == "success":
+                return offset, result["data"]
+            await asyncio.sleep(2 ** attempt)
+        return offset, None
+
+
+async def _write_page(items: list) -> tuple:
+    """
+    Writes one page of draws in a single unordered bulk_write. Returns (written, skipped).
+    History items can be thinner than what is stored (e.g. only first_ticket), so an
+    existing draw is only overwritten by an item with at least as many tiers.
+    """
+    if not items:
+        return 0, 0
+
+    # 1. Tier counts of the draws already stored (legacy ones only have 'prizes')
+    stored = {}
+    cursor = collection.find({"code": {"$in": [item["code"] for item in items]}},
+                             {"code": 1, "tiers.tier": 1, "prizes": 1})
+    async for existing in cursor:
+        stored[existing["code"]] = len(document_tiers(existing))
+
+    operations = []
+    skipped = 0
+    for item in items:
+        document = build_document(item)
+        if item["code"] not in stored:
+            # $setOnInsert: a live save that lands first is never overwritten
+            operations.append(UpdateOne({"code": item["code"]}, {"$setOnInsert": document}, upsert=True))
+        elif len(document["tiers"]) >= stored[item["code"]]:
+            operations.append(UpdateOne({"code": item["code"]}, {"$set": document, "$unset": LEGACY_FIELDS}))
+        else:
+            skipped += 1
+
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+    return len(operations), skipped
+
+
+async def _save_checkpoint(offset: int, total: int):
+    await state_collection.update_one(
+        {"_id": BACKFILL_STATE_ID},
+        {"$set": {"offset": offset, "total": total, "updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+
+async def run_backfill(page_size: int = PAGE_SIZE, concurrency: int = CONCURRENCY,
+                       rate: float = REQUESTS_PER_SECOND, restart: bool = False) -> dict:
+    """
+    Loads the whole IndiaLotteryAPI history into MongoDB.
+    Pages are fetched concurrently and written as they arrive; the checkpoint
+    only advances over contiguous finished pages, so a rerun resumes safely.
+    """
+    if backfill_progress.get("running"):
+        return {"status": "error", "message": "A backfill is already running"}
+    backfill_progress.clear()
+    backfill_progress["running"] = True
+
+    try:
+        state = await state_collection.find_one({"_id": BACKFILL_STATE_ID}) or {}
+        start_offset = 0 if restart else state.get("offset", 0)
+        started = time.perf_counter()
+        backfill_progress.update({
+            "start_offset": start_offset, "checkpoint": start_offset,
+            "pages_done": 0, "pages_failed": 0, "draws_written": 0, "draws_skipped": 0, "total": None,
+            "draws_per_second": 0.0, "started_at": datetime.utcnow()
+        })
+
+        # 1. Probe the first page to learn the archive size
+        probe = await fetch_api_history(limit=1, offset=0)
+        if probe.get("status") != "success":
+            backfill_progress["error"] = probe.get("message")
+            return {"status": "error", "message": probe.get("message")}
+        total = probe["data"].get("total", 0)
+        backfill_progress["total"] = total
+        print(f"📚 Backfill: {total} draws upstream, resuming at offset {start_offset}...")
+
+        # 2. Fetch every remaining page concurrently, bounded by the semaphore + rate limiter
+        semaphore = asyncio.Semaphore(concurrency)
+        limiter = RateLimiter(rate)
+        offsets = list(range(start_offset, total, page_size))
+        tasks = [asyncio.create_task(_fetch_page(o, page_size, semaphore, limiter)) for o in offsets]
+
+        finished = set()
+        checkpoint = start_offset
+
+        # 3. Stream pages into MongoDB in completion order
+        for next_page in asyncio.as_completed(tasks):
+            offset, page = await next_page
+            if page is None:
+                backfill_progress["pages_failed"] += 1
+                print(f"⚠️ Backfill: page at offset {offset} failed after {MAX_PAGE_ATTEMPTS} attempts.")
+                continue
+
+            written, skipped = await _write_page(page.get("items", []))
+            backfill_progress["draws_written"] += written
+            backfill_progress["draws_skipped"] += skipped
+            backfill_progress["pages_done"] += 1
+            finished.add(offset)
+
+            # Advance over contiguous pages only, so it never skips a failed one
+            while checkpoint in finished:
+                finished.discard(checkpoint)
+                checkpoint += page_size
+            if checkpoint != backfill_progress["checkpoint"]:
+                backfill_progress["checkpoint"] = min(checkpoint, total)
+                await _save_checkpoint(backfill_progress["checkpoint"], total)
+
+            elapsed = time.perf_counter() - started
+            backfill_progress["draws_per_second"] = round(backfill_progress["draws_written"] / elapsed, 1)
+
+        response_cache.clear()
+        # Backfill writes bypass save_result, so the stats rollups are recomputed
+        if backfill_progress["draws_written"]:
+            await rebuild_stats_rollups()
+        elapsed = time.perf_counter() - started
+        status = "partial" if backfill_progress["pages_failed"] else "success"
+        print(f"✅ Backfill {status}: {backfill_progress['draws_written']} draws in {elapsed:.1f}s "
+              f"({backfill_progress['draws_per_second']} draws/s)")
+        return {"status": status, **{k: v for k, v in backfill_progress.items() if k != "running"}}
+    finally:
+        backfill_progress["running"] = False
+        backfill_progress["finished_at"] = datetime.utcnow()
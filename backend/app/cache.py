@@ -0,0 +1,146 @@
+import json
+import os
+import time
+from collections import OrderedDict
+
+from app.metrics import CallbackMetric
+
+# TTLs (seconds) for the read endpoints. Upserts invalidate the affected keys
+# right away, the TTL only bounds staleness across separate workers.
+RESULTS_TTL = 300
+RESULT_TTL = 600
+LOTTERY_TYPES_TTL = 3600
+# Stats only move when a draw is saved or the rollups are rebuilt, both drop them
+STATS_TTL = 600
+# Memory budget of the response cache per worker. A full 100-draw page is ~400 KB,
+# so the entry count alone does not bound it
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_MB", "32")) * 1024 * 1024
+
+_MISSING = object()
+
+
+def _payload_size(value) -> int:
+    # Cached values are encoded payloads (CachedPayload); anything else counts as empty
+    return len(getattr(value, "body", b""))
+
+
+class TTLCache:
+    """Bounded in-process cache with per-entry TTL and LRU eviction, by entry count and by bytes."""
+
+    def __init__(self, maxsize: int = 512, ttl: float = 300, maxbytes: int = None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (expires_at, value, size)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING or entry[0] < time.monotonic():
+            if entry is not _MISSING:
+                self._remove(key)
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value, ttl: float = None):
+        size = _payload_size(value)
+        self._remove(key)
+        if self.maxbytes is not None and size > self.maxbytes:
+            return
+        self._entries[key] = (time.monotonic() + (ttl or self.ttl), value, size)
+        self.bytes += size
+        while len(self._entries) > self.maxsize or (self.maxbytes is not None and self.bytes > self.maxbytes):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def peek(self, key, default=None):
+        """Reads an entry without touching LRU order or the hit/miss counters."""
+        entry = self._entries.get(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def invalidate(self, *keys):
+        for key in keys:
+            self._remove(key)
+
+    def invalidate_where(self, predicate):
+        for key in [key for key in self._entries if predicate(key)]:
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+            "maxbytes": self.maxbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+response_cache = TTLCache(maxbytes=RESPONSE_CACHE_MAX_BYTES)
+
+CallbackMetric("response_cache_hits_total", "Read-endpoint cache hits.", lambda: response_cache.hits, "counter")
+CallbackMetric("response_cache_misses_total", "Read-endpoint cache misses.", lambda: response_cache.misses, "counter")
+CallbackMetric("response_cache_evictions_total", "Entries evicted to stay under maxsize or maxbytes.",
+               lambda: response_cache.evictions, "counter")
+CallbackMetric("response_cache_entries", "Entries currently cached.", lambda: len(response_cache._entries))
+CallbackMetric("response_cache_bytes", "Encoded bytes currently cached.", lambda: response_cache.bytes)
+
+
+def results_key(name: str = None, *page):
+    # The name filter is case-insensitive, so the key is too.
+    # `page` holds the paging/shape parameters (limit, summary).
+    return ("results", name.lower() if name else None, *page)
+
+
+def result_key(code: str):
+    return ("result", code)
+
+
+LOTTERY_TYPES_KEY = ("lottery-types",)
+
+
+def stats_key(kind: str, name: str = None, *params):
+    return ("stats", kind, name.strip().upper() if name else None, *params)
+
+
+def invalidate_stats():
+    """Every statistic can move with one draw (the 'all' rollup, trends), so drop them all."""
+    response_cache.invalidate_where(lambda key: key[0] == "stats")
+
+
+def invalidate_result(data: dict):
+    """Drops exactly the cached responses an upsert of this draw can change."""
+    name = data.get("name")
+    keys = [result_key(data["code"])]
+
+    # Every page/shape of the unfiltered listing and of this lottery's listing
+    listing_names = {None, name.lower() if name else None}
+    response_cache.invalidate_where(lambda key: key[0] == "results" and key[1] in listing_names)
+
+    # The types list only changes when a brand new lottery name shows up
+    cached_types = response_cache.peek(LOTTERY_TYPES_KEY)
+    if cached_types is not None and name not in json.loads(cached_types.body):
+        keys.append(LOTTERY_TYPES_KEY)
+
+    response_cache.invalidate(*keys)
@@ -1,6 +1,6 @@
 import os
-from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
+from app.metrics import mongo_command_listener
 
 load_dotenv()
 
@@ -13,6 +13,39 @@ if not MONGO_URI:
     MONGO_URI = "mongodb://localhost:27017/lottery_db"
     print("⚠️ Warning: MONGO_URI not found in environment. Using local fallback.")
 
-client = AsyncIOMotorClient(MONGO_URI)
-db = client.get_database("lottery_db")
-collection = db.get_collection("results")
\ No newline at end of file
+DATABASE_NAME = "lottery_db"
+
+_client = None
+
+
+def get_client():
+    """
+    The Motor client, created on first use instead of at import: a cold start pays
+    for Motor and the connection pool only once a route actually queries.
+    """
+    global _client
+    if _client is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        # The listener times every command for /api/metrics
+        _client = AsyncIOMotorClient(MONGO_URI, event_listeners=[mongo_command_listener()])
+    return _client
+
+
+class LazyCollection:
+    """Stands in for a Motor collection and resolves it (and the client) on first attribute access."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._collection = None
+
+    def __getattr__(self, attribute):
+        if self._collection is None:
+            self._collection = get_client().get_database(DATABASE_NAME).get_collection(self._name)
+        return getattr(self._collection, attribute)
+
+
+collection = LazyCollection("results")
+# Small bookkeeping documents (upstream ETag, last content hash, ...)
+state_collection = LazyCollection("scraper_state")
+# Materialized statistics, updated on every upsert (see app/stats.py)
+stats_collection = LazyCollection("stats_rollups")
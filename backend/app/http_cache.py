@@ -0,0 +1,69 @@
+import hashlib
+from typing import NamedTuple
+
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.metrics import CONDITIONAL_RESPONSES
+
+# Cache-Control for the Vercel/CDN edge. Listings change prize by prize during
+# the live draw, so they stay short; the types list almost never changes.
+RESULTS_CACHE_CONTROL = "public, max-age=30, s-maxage=60, stale-while-revalidate=300"
+RESULT_CACHE_CONTROL = "public, max-age=60, s-maxage=120, stale-while-revalidate=600"
+LOTTERY_TYPES_CACHE_CONTROL = "public, max-age=300, s-maxage=3600, stale-while-revalidate=86400"
+# Statistics move once per draw
+STATS_CACHE_CONTROL = "public, max-age=300, s-maxage=600, stale-while-revalidate=3600"
+
+
+class CachedPayload(NamedTuple):
+    body: bytes           # serialized JSON, encoded once per content revision
+    etag: str             # strong validator derived from the body
+    headers: dict = {}    # extra response headers, e.g. X-Next-Cursor
+
+
+def _encode_fallback(value):
+    # orjson handles dict/list/str/datetime natively; only Mongo ids and rarer types land here
+    from bson import ObjectId
+    if isinstance(value, ObjectId):
+        return str(value)
+    return jsonable_encoder(value)
+
+
+def encode_json(data) -> bytes:
+    """Raw Mongo documents straight to compact UTF-8 JSON (datetime as ISO 8601, ObjectId as str)."""
+    return orjson.dumps(data, default=_encode_fallback)
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class of the router: same JSON as before, encoded by orjson."""
+
+    def render(self, content) -> bytes:
+        return encode_json(content)
+
+
+def make_payload(data, headers: dict = None) -> CachedPayload:
+    body = encode_json(data)
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return CachedPayload(body, etag, headers or {})
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Clients may send a list, and CDNs sometimes weaken validators with W/
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def conditional_response(request: Request, payload: CachedPayload, cache_control: str) -> Response:
+    """Answers with 304 when the client already holds this revision, else with the cached body."""
+    headers = {**payload.headers, "ETag": payload.etag, "Cache-Control": cache_control}
+    if _etag_matches(request.headers.get("if-none-match"), payload.etag):
+        CONDITIONAL_RESPONSES.inc("not_modified")
+        return Response(status_code=304, headers=headers)
+    CONDITIONAL_RESPONSES.inc("body")
+    return Response(content=payload.body, media_type="application/json", headers=headers)
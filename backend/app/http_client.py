@@ -0,0 +1,83 @@
+import logging
+import time
+import httpx
+
+from app.metrics import UPSTREAM_RESPONSES, UPSTREAM_SECONDS, log_event
+
+# One pooled client for every upstream fetcher (IndiaLotteryAPI + Kerala site),
+# so DNS/TCP/TLS setup is paid once per connection instead of once per call.
+DEFAULT_TIMEOUT = httpx.Timeout(10.0)
+POOL_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+
+_client: httpx.AsyncClient = None
+
+# host -> running latency numbers (time until response headers arrive)
+upstream_timings = {}
+
+
+async def _start_timer(request: httpx.Request):
+    request.extensions["started_at"] = time.perf_counter()
+
+
+async def _record_timing(response: httpx.Response):
+    started_at = response.request.extensions.get("started_at")
+    if started_at is None:
+        return
+    elapsed_ms = (time.perf_counter() - started_at) * 1000
+
+    stats = upstream_timings.setdefault(response.request.url.host, {
+        "requests": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0, "http_versions": {}
+    })
+    stats["requests"] += 1
+    stats["total_ms"] += elapsed_ms
+    stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+    stats["last_ms"] = elapsed_ms
+    version = response.http_version
+    stats["http_versions"][version] = stats["http_versions"].get(version, 0) + 1
+
+    host = response.request.url.host
+    UPSTREAM_SECONDS.observe(elapsed_ms / 1000, host)
+    UPSTREAM_RESPONSES.inc(host, str(response.status_code))
+    if response.status_code >= 400:
+        log_event("upstream_error", logging.WARNING, host=host, status=response.status_code, ms=round(elapsed_ms, 1))
+
+
+def _create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=DEFAULT_TIMEOUT,
+        limits=POOL_LIMITS,
+        event_hooks={"request": [_start_timer], "response": [_record_timing]}
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """Returns the shared client, creating it lazily for scripts run outside the app lifespan."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _create_client()
+    return _client
+
+
+async def start_client():
+    get_client()
+
+
+async def close_client():
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+def timing_report() -> dict:
+    return {
+        host: {
+            "requests": stats["requests"],
+            "avg_ms": round(stats["total_ms"] / stats["requests"], 1),
+            "max_ms": round(stats["max_ms"], 1),
+            "last_ms": round(stats["last_ms"], 1),
+            "http_versions": stats["http_versions"]
+        }
+        for host, stats in upstream_timings.items()
+    }
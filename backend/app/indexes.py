@@ -0,0 +1,101 @@
+import os
+
+from app.database import collection
+from app.pagination import LISTING_SORT
+
+# Case-insensitive comparison for lottery names ("Samrudhi" == "SAMRUDHI").
+# Queries must pass the same collation to be able to use the name index.
+NAME_COLLATION = {"locale": "en", "strength": 2}
+
+
+
+def result_indexes() -> list:
+    """The results indexes. Built on call, so pymongo stays out of `import main`."""
+    from pymongo import ASCENDING, DESCENDING, IndexModel
+    return [
+        # Every upsert and /results/{code} matches on code
+        IndexModel([("code", ASCENDING)], name="code_unique", unique=True),
+        # /results?name=... filters on name and pages newest first by (iso_date, _id)
+        IndexModel(
+            [("name", ASCENDING), ("iso_date", DESCENDING), ("_id", DESCENDING)],
+            name="name_iso_date_id", collation=NAME_COLLATION
+        ),
+        # /results without a filter, /check?last=N
+        IndexModel([("iso_date", DESCENDING), ("_id", DESCENDING)], name="iso_date_id_desc"),
+    ]
+
+# Startup bootstrap costs several round trips; on Vercel that lands on every cold
+# start, so there it is off by default (POST /api/admin/indexes/ensure after deploys)
+ENSURE_INDEXES_ON_STARTUP = os.getenv("ENSURE_INDEXES", "0" if os.getenv("VERCEL") else "1") == "1"
+
+# Superseded by the keyset indexes above
+OBSOLETE_INDEXES = ["name_iso_date", "iso_date_desc"]
+
+
+async def ensure_indexes():
+    """Creates the results indexes at startup. Safe to run repeatedly."""
+    from pymongo.errors import PyMongoError
+
+    for index in result_indexes():
+        name = index.document["name"]
+        try:
+            await collection.create_indexes([index])
+        except PyMongoError as e:
+            # e.g. duplicate codes left over from before the unique index existed
+            print(f"⚠️ Could not create index {name}: {e}")
+
+    existing = await collection.index_information()
+    for name in OBSOLETE_INDEXES:
+        if name in existing:
+            await collection.drop_index(name)
+    print("🗂️ Results indexes ensured.")
+
+
+def _plan_summary(explain: dict) -> dict:
+    """Flattens an explain() result into the parts worth looking at."""
+    planner = explain.get("queryPlanner", {})
+    stats = explain.get("executionStats", {})
+
+    stages, indexes = [], []
+    plan = planner.get("winningPlan", {})
+    # Newer servers nest the classic plan under queryPlan
+    plan = plan.get("queryPlan", plan)
+    while plan:
+        stages.append(plan.get("stage"))
+        if plan.get("indexName"):
+            indexes.append(plan["indexName"])
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+
+    return {
+        "stages": stages,
+        "indexes": indexes,
+        "n_returned": stats.get("nReturned"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "execution_ms": stats.get("executionTimeMillis")
+    }
+
+
+async def explain_route_queries() -> dict:
+    """Runs explain() on the queries the read routes issue, using a real name/code as sample."""
+    from pymongo.errors import PyMongoError
+
+    sample = await collection.find_one({}, {"name": 1, "code": 1}, sort=[("iso_date", -1)])
+    if not sample:
+        return {"error": "Collection is empty"}
+
+    cursors = {
+        "GET /results": collection.find({}).sort(LISTING_SORT).limit(101),
+        "GET /results?name=": collection.find({"name": sample.get("name")}, collation=NAME_COLLATION)
+            .sort(LISTING_SORT).limit(101),
+        "GET /results/{code}": collection.find({"code": sample.get("code")}).limit(1),
+        "GET /check?last=N": collection.find({}, {"ticket_index": 1}).sort("iso_date", -1).limit(5),
+    }
+
+    plans = {"sample": {"name": sample.get("name"), "code": sample.get("code")}}
+    for route, cursor in cursors.items():
+        try:
+            plans[route] = _plan_summary(await cursor.explain())
+        except PyMongoError as e:
+            plans[route] = {"error": str(e)}
+    return plans
@@ -1,7 +1,9 @@
-import httpx
+import os
 from datetime import datetime
+from app.http_client import get_client
 
-BASE_API_URL = "https://indialotteryapi.com/wp-json/klr/v1"
+# Overridable so staging and the load benchmark can point at a local stand-in
+BASE_API_URL = os.getenv("INDIA_LOTTERY_API_URL", "https://indialotteryapi.com/wp-json/klr/v1")
 
 def transform_api_response(api_data: dict) -> dict:
     """Transforms the India Lottery API response to match our LotteryResult format."""
@@ -69,21 +71,20 @@ async def fetch_api_latest(etag: str = None) -> dict:
         headers["If-None-Match"] = etag
         
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, headers=headers)
-            
-            if response.status_code == 304:
-                return {"status": "not_modified", "etag": etag}
-                
-            response.raise_for_status()
-            data = response.json()
-            new_etag = response.headers.get("ETag")
-            
-            transformed = transform_api_response(data)
-            if transformed:
-                return {"status": "success", "data": transformed, "etag": new_etag}
-            return {"status": "error", "message": "Failed to transform response"}
+        response = await get_client().get(url, headers=headers)
+        
+        if response.status_code == 304:
+            return {"status": "not_modified", "etag": etag}
             
+        response.raise_for_status()
+        data = response.json()
+        new_etag = response.headers.get("ETag")
+        
+        transformed = transform_api_response(data)
+        if transformed:
+            return {"status": "success", "data": transformed, "etag": new_etag}
+        return {"status": "error", "message": "Failed to transform response"}
+        
     except Exception as e:
         print(f"❌ API Latest Error: {e}")
         return {"status": "error", "message": str(e)}
@@ -95,17 +96,16 @@ async def fetch_api_by_date(date_str: str) -> dict:
     headers = {"Accept": "application/json"}
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, params=params, headers=headers)
-            response.raise_for_status()
-            
-            data = response.json()
-            transformed = transform_api_response(data)
-            
-            if transformed:
-                return {"status": "success", "data": transformed}
-            return {"status": "error", "message": "Failed to transform response or not found"}
-            
+        response = await get_client().get(url, params=params, headers=headers)
+        response.raise_for_status()
+        
+        data = response.json()
+        transformed = transform_api_response(data)
+        
+        if transformed:
+            return {"status": "success", "data": transformed}
+        return {"status": "error", "message": "Failed to transform response or not found"}
+        
     except Exception as e:
         print(f"❌ API By Date Error: {e}")
         return {"status": "error", "message": str(e)}
@@ -117,33 +117,32 @@ async def fetch_api_history(limit: int = 10, offset: int = 0) -> dict:
     headers = {"Accept": "application/json"}
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, params=params, headers=headers)
-            response.raise_for_status()
-            
-            data = response.json()
-            items = data.get("items", [])
-            
-            transformed_items = []
-            for item in items:
-                # The history endpoint might have a different format, usually it's similar
-                # Let's try transforming it; notice we inject amount if necessary
-                # "first_ticket" vs "first": {"ticket": ...} handling
-                if "first" not in item and "first_ticket" in item:
-                    item["first"] = {"ticket": item["first_ticket"]}
-                    
-                t = transform_api_response(item)
-                if t:
-                    transformed_items.append(t)
-            
-            return {
-                "status": "success", 
-                "data": {
-                    "total": data.get("total", 0),
-                    "items": transformed_items
-                }
+        response = await get_client().get(url, params=params, headers=headers)
+        response.raise_for_status()
+        
+        data = response.json()
+        items = data.get("items", [])
+        
+        transformed_items = []
+        for item in items:
+            # The history endpoint might have a different format, usually it's similar
+            # Let's try transforming it; notice we inject amount if necessary
+            # "first_ticket" vs "first": {"ticket": ...} handling
+            if "first" not in item and "first_ticket" in item:
+                item["first"] = {"ticket": item["first_ticket"]}
+                
+            t = transform_api_response(item)
+            if t:
+                transformed_items.append(t)
+        
+        return {
+            "status": "success", 
+            "data": {
+                "total": data.get("total", 0),
+                "items": transformed_items
             }
-            
+        }
+        
     except Exception as e:
         print(f"❌ API History Error: {e}")
         return {"status": "error", "message": str(e)}
@@ -0,0 +1,85 @@
+import hashlib
+import json
+from datetime import datetime
+
+from app.cache import invalidate_result
+from app.database import collection, state_collection
+from app.live import publish_draw_update
+from app.prize_schema import document_prizes, normalize_prizes, prizes_view
+from app.stats import update_stats_rollups
+from app.ticket_index import build_ticket_index, first_prize
+
+# State document remembering what the pollers saw last
+SCRAPE_STATE_ID = "latest_draw"
+
+# Replaced by "tiers"; removed whenever a draw is rewritten
+LEGACY_FIELDS = {"prizes": ""}
+
+
+def build_document(data: dict) -> dict:
+    """
+    The stored form of a draw: normalized prize tiers instead of the label-keyed
+    prizes, plus its precomputed ticket index and 1st prize.
+    """
+    tiers = normalize_prizes(data.get("prizes", {}))
+    prizes = prizes_view(tiers)
+    document = {key: value for key, value in data.items() if key != "prizes"}
+    return {**document, "tiers": tiers, "ticket_index": build_ticket_index(prizes), "first_prize": first_prize(prizes)}
+
+
+async def save_result(data: dict):
+    """Upserts a draw keyed on its code, together with its precomputed ticket index."""
+    from pymongo import ReturnDocument
+
+    document = build_document(data)
+    # BEFORE image lets live clients and the stats rollups see only what changed
+    previous = await collection.find_one_and_update(
+        {"code": data["code"]},
+        {"$set": document, "$unset": LEGACY_FIELDS},
+        projection={"prizes": 1, "tiers": 1},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
+    )
+    invalidate_result(data)
+    # Both sides in canonical labels, so a relabelled tier is not reported as new
+    current = {**data, "prizes": prizes_view(document["tiers"])}
+    publish_draw_update(current, {"prizes": document_prizes(previous)} if previous else None)
+    await update_stats_rollups(document, previous)
+
+
+def content_hash(data: dict) -> str:
+    """Stable fingerprint of a transformed draw."""
+    encoded = json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+async def load_scrape_state() -> dict:
+    return await state_collection.find_one({"_id": SCRAPE_STATE_ID}) or {}
+
+
+async def save_if_changed(data: dict, source: str, state: dict, etag: str = None) -> bool:
+    """
+    Upserts the draw only if it differs from the last one saved, then records
+    the new hash (and upstream ETag) so the next poll can be conditional.
+    Returns True when a write happened.
+    """
+    digest = content_hash(data)
+    changed = digest != state.get("content_hash")
+    if changed:
+        await save_result(data)
+
+    update = {
+        "content_hash": digest,
+        "code": data["code"],
+        "draw_date": data.get("draw_date"),
+        "source": source,
+        "checked_at": datetime.utcnow()
+    }
+    if source == "API":
+        # Lets later polls skip the PDF fallback for the rest of the day
+        update["api_draw_date"] = data.get("draw_date")
+    if etag:
+        update["etag"] = etag
+    await state_collection.update_one({"_id": SCRAPE_STATE_ID}, {"$set": update}, upsert=True)
+    state.update(update)
+    return changed
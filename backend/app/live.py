@@ -0,0 +1,174 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from app.metrics import CallbackMetric
+from app.prize_schema import document_prizes
+
+# With several workers, each one tails the MongoDB change stream instead of
+# relying on the upsert happening in its own process.
+USE_CHANGE_STREAM = os.getenv("LIVE_CHANGE_STREAM", "0") == "1"
+
+SUBSCRIBER_QUEUE_SIZE = 100
+# Only draws this recent are live; backfills and migrations rewrite older ones
+LIVE_DRAW_MAX_AGE_DAYS = 1
+IST = ZoneInfo("Asia/Kolkata")
+KEEPALIVE_SECONDS = 15
+
+
+class Broadcaster:
+    """Fans one event out to every connected live client (one queue per client)."""
+
+    def __init__(self):
+        self._subscribers = set()
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, event: dict):
+        self.published += 1
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A stalled client must not hold everyone else back
+                self.dropped += 1
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+            "mode": "change_stream" if USE_CHANGE_STREAM else "in_process"
+        }
+
+
+broadcaster = Broadcaster()
+
+CallbackMetric("live_subscribers", "Connected /api/live clients.", lambda: len(broadcaster._subscribers))
+CallbackMetric("live_events_dropped_total", "Events dropped for stalled live clients.", lambda: broadcaster.dropped, "counter")
+
+
+def prize_diff(before: dict, after: dict) -> dict:
+    """New numbers per prize label, plus labels that disappeared. None when nothing changed."""
+    added = {}
+    for label, numbers in after.items():
+        known = set(before.get(label, []))
+        new_numbers = [n for n in numbers if n not in known]
+        if new_numbers:
+            added[label] = new_numbers
+    removed = [label for label in before if label not in after]
+
+    if not added and not removed:
+        return None
+    return {"added": added, "removed": removed}
+
+
+def _draw_event(data: dict, previous_prizes, diff: dict) -> dict:
+    return {
+        "type": "draw_update",
+        "code": data.get("code"),
+        "name": data.get("name"),
+        "draw_date": data.get("draw_date"),
+        "is_new": previous_prizes is None,
+        **diff
+    }
+
+
+def publish_draw_update(data: dict, previous: dict):
+    """Called after an upsert with the document as it was before (None if it was inserted)."""
+    if USE_CHANGE_STREAM:
+        return
+    previous_prizes = previous.get("prizes", {}) if previous else None
+    diff = prize_diff(previous_prizes or {}, data.get("prizes", {}))
+    if diff:
+        broadcaster.publish(_draw_event(data, previous_prizes, diff))
+
+
+def _is_live_draw(document: dict) -> bool:
+    iso_date = document.get("iso_date")
+    if not isinstance(iso_date, datetime):
+        return False
+    return iso_date.date() >= datetime.now(IST).date() - timedelta(days=LIVE_DRAW_MAX_AGE_DAYS)
+
+
+def _touches_prizes(change: dict) -> bool:
+    if change["operationType"] != "update":
+        return True
+    description = change.get("updateDescription", {})
+    fields = list(description.get("updatedFields", {})) + description.get("removedFields", [])
+    return any(field.split(".")[0] in ("tiers", "prizes") for field in fields)
+
+
+async def _enable_pre_images(collection) -> bool:
+    """Lets the stream carry each document as it was before the change (MongoDB 6.0+)."""
+    try:
+        await collection.database.command({
+            "collMod": collection.name, "changeStreamPreAndPostImages": {"enabled": True}
+        })
+        return True
+    except Exception as e:
+        print(f"⚠️ Change stream pre-images unavailable ({e}); diffing against this worker's last copy.")
+        return False
+
+
+async def watch_change_stream(collection):
+    """
+    Multi-worker mode: turns prize updates of live draws seen on the change stream
+    into live events. Diffs against the pre-image when the server keeps one, else
+    against this worker's last copy of the draw (bounded to live draws).
+    """
+    last_prizes = {}   # code -> (iso_date, prizes) of live draws, as last seen by this worker
+    pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+    before_change = "whenAvailable" if await _enable_pre_images(collection) else None
+    while True:
+        try:
+            async with collection.watch(pipeline, full_document="updateLookup",
+                                        full_document_before_change=before_change) as stream:
+                async for change in stream:
+                    document = change.get("fullDocument")
+                    if not document or "code" not in document:
+                        continue
+                    if not _is_live_draw(document) or not _touches_prizes(change):
+                        continue
+
+                    code = document["code"]
+                    prizes = document_prizes(document)
+                    before = change.get("fullDocumentBeforeChange")
+                    if change["operationType"] == "insert":
+                        previous_prizes = None
+                    elif before is not None:
+                        previous_prizes = document_prizes(before)
+                    elif code in last_prizes:
+                        previous_prizes = last_prizes[code][1]
+                    else:
+                        # No baseline (first sight in this worker): remember it, report nothing
+                        previous_prizes = prizes
+
+                    # 1. Forget draws that are no longer live, then remember this one
+                    for stale in [key for key, (iso_date, _) in last_prizes.items()
+                                  if not _is_live_draw({"iso_date": iso_date})]:
+                        del last_prizes[stale]
+                    last_prizes[code] = (document["iso_date"], prizes)
+
+                    diff = prize_diff(previous_prizes or {}, prizes)
+                    if diff:
+                        broadcaster.publish(_draw_event(document, previous_prizes, diff))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Live change stream interrupted: {e}. Reconnecting in 5 seconds...")
+            await asyncio.sleep(5)
+
+
+def format_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
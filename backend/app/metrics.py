@@ -0,0 +1,249 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+# Latency buckets in seconds, from cache hits (a few ms) to PDF scrapes (tens of s)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Every request is logged with ACCESS_LOG=1; otherwise only the slow ones
+ACCESS_LOG = os.getenv("ACCESS_LOG", "0") == "1"
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_registry = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic count per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+        # Mongo events arrive on the driver's worker threads
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def lines(self) -> list:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {value}" for key, value in values]
+
+
+class Histogram:
+    """Bucketed distribution (cumulative on output, like Prometheus expects)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self._values = {}   # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, *label_values):
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][position] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def lines(self) -> list:
+        with self._lock:
+            values = [(key, list(entry[0]), entry[1], entry[2]) for key, entry in self._values.items()]
+        lines = []
+        for key, counts, total, count in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labels, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {round(total, 6)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class CallbackMetric:
+    """Value read from existing bookkeeping at scrape time (cache counters, subscribers)."""
+
+    def __init__(self, name: str, documentation: str, read, kind: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self._read = read
+        _registry.append(self)
+
+    def lines(self) -> list:
+        return [f"{self.name} {self._read()}"]
+
+
+def render_metrics() -> str:
+    """Prometheus text exposition of every metric of this process."""
+    lines = []
+    for metric in _registry:
+        samples = metric.lines()
+        if not samples:
+            continue
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+# --- METRICS ---
+REQUESTS = Counter("http_requests_total", "Requests served, by route template and status.",
+                   ("method", "route", "status"))
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Request latency by route template.",
+                            ("method", "route"))
+CONDITIONAL_RESPONSES = Counter("http_conditional_responses_total",
+                                "Cached read responses, answered with a body or with 304.", ("result",))
+MONGO_SECONDS = Histogram("mongo_command_duration_seconds", "MongoDB command latency.",
+                          ("command", "collection"))
+MONGO_FAILURES = Counter("mongo_command_failures_total", "MongoDB commands that failed.",
+                         ("command", "collection"))
+UPSTREAM_SECONDS = Histogram("upstream_request_duration_seconds",
+                             "Time until response headers from an upstream host.", ("host",))
+UPSTREAM_RESPONSES = Counter("upstream_responses_total", "Upstream responses by host and status code.",
+                             ("host", "status"))
+SOURCE_SECONDS = Histogram("source_fetch_duration_seconds", "Full fetch time of a result source (API, PDF).",
+                           ("source",))
+SOURCE_OUTCOMES = Counter("source_fetches_total",
+                          "Result source runs by outcome (won, valid, missed, cancelled).", ("source", "outcome"))
+PDF_STAGE_SECONDS = Histogram("pdf_stage_duration_seconds", "Official PDF path: download, extract, parse.",
+                              ("stage",))
+
+_in_flight = 0
+CallbackMetric("http_requests_in_flight", "Requests currently being served.", lambda: _in_flight)
+
+
+# --- STRUCTURED LOGGING ---
+logger = logging.getLogger("lottery")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger.propagate = False
+
+
+def log_event(event: str, level: int = logging.INFO, **fields):
+    """One JSON line per event; nothing is serialized when the level is disabled."""
+    if not logger.isEnabledFor(level):
+        return
+    record = {"ts": round(time.time(), 3), "level": logging.getLevelName(level).lower(), "event": event, **fields}
+    logger.log(level, json.dumps(record, default=str, separators=(",", ":")))
+
+
+# --- REQUEST MIDDLEWARE ---
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware (no per-request task or body buffering, so SSE streams pass through).
+    Labels by route template ('/api/results/{code}'), never by raw path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        global _in_flight
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        _in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _in_flight -= 1
+            elapsed = time.perf_counter() - started
+            # The router stores the matched route in the (shared) scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            REQUESTS.inc(method, route, str(status))
+            REQUEST_SECONDS.observe(elapsed, method, route)
+
+            elapsed_ms = round(elapsed * 1000, 1)
+            if ACCESS_LOG or elapsed_ms >= SLOW_REQUEST_MS:
+                log_event("request", logging.INFO if elapsed_ms < SLOW_REQUEST_MS else logging.WARNING,
+                          method=method, route=route, path=scope["path"], status=status, ms=elapsed_ms)
+
+
+# --- MONGODB COMMAND LISTENER ---
+class MongoCommandMetrics:
+    """Times every command the driver sends; see mongo_command_listener()."""
+
+    def __init__(self):
+        self._collections = {}   # (connection, request id) -> collection of the running command
+
+    def started(self, event):
+        target = event.command.get("collection") if event.command_name == "getMore" else event.command.get(event.command_name)
+        self._collections[(event.connection_id, event.request_id)] = target if isinstance(target, str) else ""
+
+    def _finish(self, event) -> tuple:
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        seconds = event.duration_micros / 1_000_000
+        MONGO_SECONDS.observe(seconds, event.command_name, collection)
+        if seconds * 1000 >= SLOW_QUERY_MS:
+            log_event("slow_mongo_command", logging.WARNING, command=event.command_name,
+                      collection=collection, ms=round(seconds * 1000, 1))
+        return collection
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        collection = self._finish(event)
+        MONGO_FAILURES.inc(event.command_name, collection)
+
+
+def mongo_command_listener():
+    """
+    The listener registered on the client in app/database.py. pymongo only accepts
+    monitoring.CommandListener subclasses; the subclass is made here so that
+    pymongo is imported with the client, not with this module.
+    """
+    from pymongo import monitoring
+
+    class Listener(MongoCommandMetrics, monitoring.CommandListener):
+        pass
+
+    return Listener()
@@ -0,0 +1,136 @@
+import time
+from datetime import datetime
+from typing import Callable, NamedTuple
+
+from app.cache import response_cache
+from app.database import collection
+from app.ingest import LEGACY_FIELDS, build_document
+from app.prize_schema import document_prizes
+from app.ticket_index import build_ticket_index, first_prize
+
+BATCH_SIZE = 500
+
+
+class Migration(NamedTuple):
+    name: str
+    filter: dict                          # only documents that still need the change
+    projection: dict                      # only the fields transform() reads
+    transform: Callable[[dict], dict]     # document -> $set fields (None = skip)
+    unset: dict = {}                      # fields removed from every transformed document
+
+
+# name -> progress of the current (or last) run, served by the status endpoint
+migration_progress = {}
+
+
+def _iso_date_from_draw_date(document: dict):
+    try:
+        return {"iso_date": datetime.strptime(document["draw_date"], "%d/%m/%Y")}
+    except Exception as e:
+        print(f"Skipping {document.get('code')}: {e}")
+        return None
+
+
+FIX_ISO_DATE = Migration(
+    name="fix-iso-date",
+    filter={
+        "draw_date": {"$regex": r"^\d{2}/\d{2}/\d{4}$"},
+        # Missing or different from what draw_date says (compared server-side)
+        "$expr": {"$ne": [
+            "$iso_date",
+            {"$dateFromString": {"dateString": "$draw_date", "format": "%d/%m/%Y", "onError": None}}
+        ]}
+    },
+    projection={"code": 1, "draw_date": 1},
+    transform=_iso_date_from_draw_date
+)
+
+ADD_FIRST_PRIZE = Migration(
+    name="add-first-prize",
+    filter={"first_prize": {"$exists": False}},
+    projection={"prizes": 1, "tiers": 1},
+    transform=lambda document: {"first_prize": first_prize(document_prizes(document))}
+)
+
+
+def _normalized_fields(document: dict):
+    # Labels become canonical, so the derived fields are rebuilt alongside
+    build = build_document({"prizes": document.get("prizes", {})})
+    return {key: build[key] for key in ("tiers", "ticket_index", "first_prize")}
+
+
+NORMALIZE_PRIZES = Migration(
+    name="normalize-prizes",
+    filter={"tiers": {"$exists": False}, "prizes": {"$exists": True}},
+    projection={"prizes": 1},
+    transform=_normalized_fields,
+    unset=LEGACY_FIELDS
+)
+
+# Indexes built before full tickets below 3rd prize (bumper draws) matched on the full number
+REBUILD_TICKET_INDEX = Migration(
+    name="rebuild-ticket-index",
+    filter={"tiers": {"$elemMatch": {"tier": {"$gte": 4}, "tickets.0": {"$exists": True}}}},
+    projection={"tiers": 1},
+    transform=lambda document: {"ticket_index": build_ticket_index(document_prizes(document))}
+)
+
+MIGRATIONS = {
+    migration.name: migration
+    for migration in [FIX_ISO_DATE, ADD_FIRST_PRIZE, NORMALIZE_PRIZES, REBUILD_TICKET_INDEX]
+}
+
+
+async def run_migration(migration: Migration, batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Streams the matching documents through a projected, batched cursor and
+    flushes the updates in chunked unordered bulk_writes.
+    """
+    from pymongo import UpdateOne
+
+    progress = migration_progress.get(migration.name)
+    if progress and progress.get("running"):
+        return progress
+
+    progress = {
+        "running": True, "scanned": 0, "updated": 0, "skipped": 0,
+        "batches": 0, "started_at": datetime.utcnow()
+    }
+    migration_progress[migration.name] = progress
+    started = time.perf_counter()
+
+    async def flush(operations):
+        result = await collection.bulk_write(operations, ordered=False)
+        progress["updated"] += result.modified_count
+        progress["batches"] += 1
+
+    try:
+        operations = []
+        cursor = collection.find(migration.filter, migration.projection, batch_size=batch_size)
+        async for document in cursor:
+            progress["scanned"] += 1
+            update = migration.transform(document)
+            if not update:
+                progress["skipped"] += 1
+                continue
+
+            change = {"$set": update, "$unset": migration.unset} if migration.unset else {"$set": update}
+            operations.append(UpdateOne({"_id": document["_id"]}, change))
+            if len(operations) >= batch_size:
+                await flush(operations)
+                operations = []
+
+        if operations:
+            await flush(operations)
+
+        if progress["updated"]:
+            response_cache.clear()
+        print(f"✅ Migration {migration.name}: updated {progress['updated']} of {progress['scanned']} scanned.")
+    except Exception as e:
+        progress["error"] = str(e)
+        print(f"❌ Migration {migration.name} failed: {e}")
+    finally:
+        progress["running"] = False
+        progress["elapsed_seconds"] = round(time.perf_counter() - started, 2)
+
+    return progress
@@ -1,10 +1,30 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class LotteryResult(BaseModel):
     name: str                   # e.g., SUVARNA KERALAM
     code: str                   # e.g., SK-37
     draw_date: str              # e.g., 23/01/2026
     prizes: Dict[str, List[str]] # e.g., {"1st Prize": ["RH 700044"], "4th Prize": ["1671", "2881"]}
-    scraped_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    scraped_at: datetime = Field(default_factory=datetime.utcnow)
+
+class BulkCheckRequest(BaseModel):
+    codes: List[str]                                 # e.g., ["SK-37", "SM-44"]
+    tickets: List[str] = []                          # e.g., ["RH 700044", "RH 700045"]
+    ranges: List[str] = []                           # e.g., ["RH 700000-700999"]
+
+# --- Response models: document the served JSON. Routes return pre-encoded bytes, so they are never validated per request ---
+class PrizeTier(BaseModel):
+    tier: Optional[int] = None                       # 1-9, 0 = Consolation, None = unrecognised label
+    amount: Optional[int] = None                     # e.g., 5000
+    label: str                                       # e.g., "4th Prize Rs 5000"
+
+class ResultResponse(BaseModel):
+    id: str = Field(alias="_id")
+    name: str
+    code: str
+    draw_date: str
+    iso_date: Optional[datetime] = None
+    prizes: Dict[str, List[str]]
+    tiers: Optional[List[PrizeTier]] = None          # absent in summary listings
@@ -0,0 +1,50 @@
+import base64
+import json
+from datetime import datetime
+
+
+# Keyset order for listings: newest draw first, _id breaks ties between same-day draws
+LISTING_SORT = [("iso_date", -1), ("_id", -1)]
+
+# Summary listings only need the headline of each draw
+SUMMARY_PROJECTION = {"name": 1, "code": 1, "draw_date": 1, "iso_date": 1, "first_prize": 1}
+
+
+def encode_cursor(document: dict) -> str:
+    """Opaque cursor pointing just after this document in LISTING_SORT order."""
+    iso_date = document.get("iso_date")
+    raw = json.dumps({
+        "d": iso_date.isoformat() if isinstance(iso_date, datetime) else None,
+        "i": str(document["_id"])
+    })
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def cursor_filter(cursor: str):
+    """Turns a cursor back into the filter for the next page. Returns None if it is invalid."""
+    from bson import ObjectId
+    from bson.errors import InvalidId
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id = ObjectId(raw["i"])
+        last_date = datetime.fromisoformat(raw["d"]) if raw.get("d") else None
+    except (ValueError, KeyError, TypeError, InvalidId):
+        return None
+
+    if last_date is None:
+        # Undated documents sort last, only _id is left to page on
+        return {"iso_date": None, "_id": {"$lt": last_id}}
+    return {"$or": [
+        {"iso_date": {"$lt": last_date}},
+        {"iso_date": last_date, "_id": {"$lt": last_id}},
+        {"iso_date": None}
+    ]}
+
+
+def to_summary(document: dict) -> dict:
+    """Reshapes a summary row so 'prizes' holds just the 1st prize, like the full shape."""
+    first = document.pop("first_prize", None)
+    document["prizes"] = {first["label"]: first["numbers"]} if first else {}
+    return document
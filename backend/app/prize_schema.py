@@ -0,0 +1,125 @@
+from app.ticket_index import TICKET_PATTERN, prize_amount, prize_tier
+
+# Stored form of a draw's prizes, one entry per tier in draw order:
+#   {"tier": 1, "amount": 7500000, "tickets": [packed tickets]}
+#   {"tier": 4, "amount": 5000, "suffixes": [4-digit numbers as ints]}
+# A full ticket "RH 700044" packs into one int: series index * 1_000_000 + number.
+# Numbers that fit neither form stay in "raw"; labels without a tier keep their "label".
+SERIES_BASE = 1_000_000
+
+
+def pack_ticket(ticket: str):
+    """'RH 700044' -> 464700044. Returns None if it is not a full ticket."""
+    match = TICKET_PATTERN.match(ticket.strip().upper())
+    if not match:
+        return None
+    series = match.group(1)
+    return ((ord(series[0]) - 65) * 26 + (ord(series[1]) - 65)) * SERIES_BASE + int(match.group(2))
+
+
+def series_letters(index: int) -> str:
+    """Series index (0 = 'AA') -> its two letters."""
+    first, second = divmod(int(index), 26)
+    return f"{chr(65 + first)}{chr(65 + second)}"
+
+
+# Every listing turns thousands of ints back into text; table lookups beat formatting each one
+_SERIES_TEXT = [series_letters(index) for index in range(26 * 26)]
+_SUFFIX_TEXT = [f"{suffix:04d}" for suffix in range(10_000)]
+
+
+def unpack_ticket(packed: int) -> str:
+    series, number = divmod(packed, SERIES_BASE)
+    return f"{_SERIES_TEXT[series]} {number:06d}"
+
+
+def tier_label(tier: int, amount: int = None) -> str:
+    """The one label format both sources are served with, e.g. '4th Prize Rs 5000'."""
+    if tier == 0:
+        return "Consolation Prize"
+    suffix = "th" if 10 <= tier % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(tier % 10, "th")
+    return f"{tier}{suffix} Prize Rs {amount}" if amount is not None else f"{tier}{suffix} Prize"
+
+
+def normalize_prizes(prizes: dict) -> list:
+    """Label-keyed prizes (API or PDF wording) -> normalized tiers."""
+    tiers = []
+    for label, numbers in prizes.items():
+        tier = prize_tier(label)
+        entry = {"tier": tier, "amount": prize_amount(label) if tier else None}
+        if tier is None:
+            entry["label"] = label
+
+        tickets, suffixes, raw = [], [], []
+        for number in numbers:
+            number = number.strip()
+            packed = pack_ticket(number)
+            if packed is not None:
+                tickets.append(packed)
+            elif len(number) == 4 and number.isdigit():
+                suffixes.append(int(number))
+            else:
+                raw.append(number)
+
+        for field, values in (("tickets", tickets), ("suffixes", suffixes), ("raw", raw)):
+            if values:
+                entry[field] = values
+        tiers.append(entry)
+    return tiers
+
+
+def tier_numbers(entry: dict) -> list:
+    return (
+        [unpack_ticket(packed) for packed in entry.get("tickets", [])]
+        + [_SUFFIX_TEXT[suffix] for suffix in entry.get("suffixes", [])]
+        + entry.get("raw", [])
+    )
+
+
+def prizes_view(tiers: list) -> dict:
+    """Normalized tiers -> the label-keyed 'prizes' shape the API has always served."""
+    prizes = {}
+    for entry in tiers:
+        label = entry.get("label") or tier_label(entry["tier"], entry.get("amount"))
+        prizes.setdefault(label, []).extend(tier_numbers(entry))
+    return prizes
+
+
+def canonical_prizes(prizes: dict) -> dict:
+    """Same prizes with canonical labels and ticket spacing, whichever source produced them."""
+    return prizes_view(normalize_prizes(prizes))
+
+
+def document_tiers(document: dict) -> list:
+    """Normalized tiers of a stored draw (documents saved before the schema change only have 'prizes')."""
+    if "tiers" in document:
+        return document["tiers"]
+    return normalize_prizes(document.get("prizes", {}))
+
+
+def document_prizes(document: dict) -> dict:
+    return prizes_view(document_tiers(document))
+
+
+def tier_labels(tiers: list) -> dict:
+    """tier -> (label, amount), for turning ticket-index hits back into prizes."""
+    return {
+        entry["tier"]: (tier_label(entry["tier"], entry.get("amount")), entry.get("amount"))
+        for entry in tiers if entry["tier"] is not None
+    }
+
+
+def to_api_shape(document: dict) -> dict:
+    """
+    Compatibility view of a stored draw: 'prizes' as before, plus 'tiers' with
+    the tier number and integer amount of each label so clients never parse labels.
+    """
+    prizes, meta = {}, []
+    # Same as prizes_view, with each label formatted once for both fields
+    for entry in document_tiers(document):
+        label = entry.get("label") or tier_label(entry["tier"], entry.get("amount"))
+        prizes.setdefault(label, []).extend(tier_numbers(entry))
+        meta.append({"tier": entry["tier"], "amount": entry.get("amount"), "label": label})
+    document["prizes"] = prizes
+    document["tiers"] = meta
+    return document
@@ -1,14 +1,57 @@
-from fastapi import APIRouter, Query
-from app.scrapper import fetch_latest_results
-from app.india_lottery_api import fetch_api_latest
+import asyncio
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from app.auth import require_admin
 from app.database import collection
-from app.models import LotteryResult
+from app.cache import (
+    response_cache, results_key, result_key, stats_key, LOTTERY_TYPES_KEY,
+    RESULTS_TTL, RESULT_TTL, LOTTERY_TYPES_TTL, STATS_TTL
+)
+from app.http_cache import (
+    FastJSONResponse, make_payload, conditional_response,
+    RESULTS_CACHE_CONTROL, RESULT_CACHE_CONTROL, LOTTERY_TYPES_CACHE_CONTROL, STATS_CACHE_CONTROL
+)
+from app.live import broadcaster, format_sse, KEEPALIVE_SECONDS
+from app.metrics import CONTENT_TYPE, render_metrics
+from app.indexes import NAME_COLLATION, ensure_indexes, explain_route_queries
+from app.prize_schema import document_prizes, document_tiers, tier_labels, to_api_shape
+from app.pagination import LISTING_SORT, SUMMARY_PROJECTION, cursor_filter, encode_cursor, to_summary
+from app.migrations import FIX_ISO_DATE, MIGRATIONS, migration_progress, run_migration
+from app.scheduler import scheduler_status
+from app.stats import (
+    digit_frequency, hot_cold_numbers, load_rollup, lottery_trends,
+    rebuild_stats_rollups, series_frequency, stats_progress
+)
+from app.ingest import save_result, save_if_changed, load_scrape_state
+from app.models import LotteryResult, BulkCheckRequest, ResultResponse
+from app.ticket_index import (
+    build_ticket_index, lookup_ticket, match_tickets, normalize_ticket, parse_ticket_range
+)
 from datetime import datetime
-import pytz
-router = APIRouter()
+from typing import List
+router = APIRouter(default_response_class=FastJSONResponse)
+
+# Upper bound for one bulk check (a few thousand books of 100 tickets)
+MAX_BULK_TICKETS = 100_000
+# Upper bound for one range (an agent's whole stock of a series, not the full million)
+MAX_RANGE_TICKETS = 10_000
+# Draws per bulk check (same bound as /check?last=N)
+MAX_BULK_CODES = 50
+# Every ticket is matched against every draw on the event loop: bounds tickets x draws (~1 s of matching)
+MAX_BULK_CHECKS = 1_000_000
+
+# Enough of each draw's tiers to turn ticket-index hits back into labels and amounts
+CHECK_TIERS_PROJECTION = {"tiers.tier": 1, "tiers.amount": 1}
+
+# Maintenance routes that write in bulk or crawl upstream: POST + CRON_SECRET bearer (see app/auth.py)
+ADMIN = [Depends(require_admin)]
+
+# The scraper stack (httpx, BeautifulSoup, pypdf, APScheduler) is imported inside the
+# routes that use it, so a cold start serving reads never loads it.
 
 @router.get("/scrape-now")
 async def trigger_scrape():
+    from app.scrapper import fetch_latest_results
     data = await fetch_latest_results()
     if data:
         # Ensure iso_date is present
@@ -16,130 +59,383 @@ async def trigger_scrape():
             data["iso_date"] = datetime.now()
 
         # Save to MongoDB
-        await collection.update_one(
-            {"code": data["code"]}, 
-            {"$set": data}, 
-            upsert=True
-        )
+        await save_result(data)
         return {"message": "Success", "data": data}
     return {"message": "Failed to fetch"}
 
 @router.get("/scrape-live")
 async def trigger_live_scrape():
     """Fetches live results from IndiaLotteryAPI"""
-    result = await fetch_api_latest()
+    from app.india_lottery_api import fetch_api_latest
+    state = await load_scrape_state()
+    result = await fetch_api_latest(etag=state.get("etag"))
+    if result.get("status") == "not_modified":
+        return {"message": "Live data not modified", "code": state.get("code")}
     if result.get("status") == "success":
         data = result["data"]
-        # Save to MongoDB
-        await collection.update_one(
-            {"code": data["code"]}, 
-            {"$set": data}, 
-            upsert=True
-        )
-        return {"message": "Live Success", "data": data}
+        # Save to MongoDB (skipped when nothing changed since the last poll)
+        changed = await save_if_changed(data, "API", state, etag=result.get("etag"))
+        return {"message": "Live Success", "changed": changed, "data": data}
     return {"message": "Failed to fetch live data", "details": result}
 
 @router.get("/cron/daily-scrape")
 async def cron_daily_scrape():
     """
     Triggered by Vercel Cron.
-    Checks if today's results exist. If not, it scrapes.
-    If it finds today's results, it stops trying for the day.
+    Shares the Mongo lease with the background scheduler, so only one scrape runs at a time.
     """
-    ist = pytz.timezone('Asia/Kolkata')
-    today_str = datetime.now(ist).strftime("%d/%m/%Y")
-    
-    print(f"🕒 [{datetime.now(ist).strftime('%H:%M:%S')}] Cron job running for {today_str}...")
+    from app.scrape_jobs import run_daily_scrape_exclusive
+    return await run_daily_scrape_exclusive(owner="vercel-cron")
 
-    # 1. CONTINUE SCRAPING: We no longer stop if data exists, so live data updates can flow in
-    # existing = await collection.find_one({"draw_date": today_str})
-    # if existing:
-    #     # print(f"✅ SUCCESS: Results for {today_str} already exist in DB. Skipping task.")
-    #     # return
+@router.get("/scheduler/status")
+async def get_scheduler_status():
+    """State of the background poller: interval, next run, last run latency"""
+    return scheduler_status()
+
+@router.get("/results", responses={200: {"model": List[ResultResponse]}})
+async def get_all_results(
+    request: Request,
+    name: str = Query(None),
+    limit: int = Query(100, ge=1, le=100),
+    cursor: str = Query(None),
+    summary: bool = Query(False)
+):
+    """
+    Newest draws first, paged by keyset on (iso_date, _id).
+    The next page's cursor is sent in the X-Next-Cursor header.
+    summary=true returns only name, code, dates and the 1st prize.
+    """
+    # Only first pages are cached: cursors are client-made and unbounded in number,
+    # deeper pages are read once per crawl anyway
+    cache_key = results_key(name, limit, summary) if not cursor else None
+    payload = response_cache.get(cache_key) if cache_key else None
+    if payload is not None:
+        return conditional_response(request, payload, RESULTS_CACHE_CONTROL)
 
-    # 2. ATTEMPT INDIA LOTTERY API
-    print(f"📡 Trying India Lottery API for {today_str}...")
-    live_result = await fetch_api_latest()
-    
-    if live_result.get("status") == "success":
-        live_data = live_result["data"]
-        # Only save if the API date matches today
-        if live_data and live_data.get("draw_date") == today_str:
-            await collection.update_one(
-                {"code": live_data["code"]}, 
-                {"$set": live_data}, 
-                upsert=True
-            )
-            msg = f"⚡ API UPDATE: Fetched and saved results for {today_str}."
-            print(msg)
-            return {"status": "success", "message": msg, "source": "API"}
-
-    # --- OFFICIAL PDF FALLBACK (If API not ready) ---
-    print(f"⚠️ API not ready for {today_str}. Trying Official PDF fallback...")
-    data = await fetch_latest_results()
-    
-    # 3. DATE VERIFICATION: Only save if the scraped PDF date matches today
-    if data and data.get("draw_date") == today_str:
-        # Try to save to MongoDB
-        await collection.update_one(
-            {"code": data["code"]}, 
-            {"$set": data}, 
-            upsert=True
-        )
-        msg = f"🚀 OFFICIAL PDF: Saved provisional results for {today_str}."
-        print(msg)
-        return {"status": "success", "message": msg, "source": "PDF"}
-            
-    msg = f"⏳ NOT READY: Neither API nor Official PDF results available for {today_str} yet."
-    print(msg)
-    return {"status": "pending", "message": msg}
-
-@router.get("/results")
-async def get_all_results(name: str = Query(None)):
     query = {}
+    find_options = {}
     if name:
-        # This uses a Regular Expression to make the search case-insensitive
-        query = {"name": {"$regex": f"^{name}$", "$options": "i"}}
+        # Case-insensitive match through the collated (name, iso_date) index
+        query["name"] = name
+        find_options["collation"] = NAME_COLLATION
+    if cursor:
+        after = cursor_filter(cursor)
+        if after is None:
+            return {"error": "Invalid cursor"}
+        query.update(after)
+
+    projection = SUMMARY_PROJECTION if summary else {"ticket_index": 0, "first_prize": 0}
     
     # --- FIX: Sort by 'iso_date' instead of 'draw_date' ---
-    # -1 means Descending (Newest dates first)
-    results = await collection.find(query).sort("iso_date", -1).to_list(100)
+    # -1 means Descending (Newest dates first); one extra row tells us whether another page exists
+    results = await collection.find(query, projection, **find_options).sort(LISTING_SORT).to_list(limit + 1)
+
+    headers = {}
+    if len(results) > limit:
+        results = results[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(results[-1])
     
-    for r in results: 
-        r["_id"] = str(r["_id"])
-    return results
-@router.get("/results/{code}")
-async def get_result_by_code(code: str):
+    # _id and iso_date are left as they are: encode_json writes ObjectId and datetime natively
+    for r in results:
+        if summary:
+            to_summary(r)
+        else:
+            to_api_shape(r)
+    payload = make_payload(results, headers)
+    if cache_key:
+        response_cache.set(cache_key, payload, RESULTS_TTL)
+    return conditional_response(request, payload, RESULTS_CACHE_CONTROL)
+
+@router.get("/results/{code}", responses={200: {"model": ResultResponse}})
+async def get_result_by_code(request: Request, code: str):
     """Fetch a specific lottery result by its code"""
-    result = await collection.find_one({"code": code})
+    payload = response_cache.get(result_key(code))
+    if payload is not None:
+        return conditional_response(request, payload, RESULT_CACHE_CONTROL)
+
+    result = await collection.find_one({"code": code}, {"ticket_index": 0, "first_prize": 0})
     if result:
-        result["_id"] = str(result["_id"])
-        return result
+        payload = make_payload(to_api_shape(result))
+        response_cache.set(result_key(code), payload, RESULT_TTL)
+        return conditional_response(request, payload, RESULT_CACHE_CONTROL)
     return {"error": "Result not found"}
 
+async def _load_ticket_index(draw: dict) -> dict:
+    index = draw.get("ticket_index")
+    if index is None or "tiers" not in draw:
+        # Older documents were saved before the index existed, or index prize labels
+        legacy = await collection.find_one({"_id": draw["_id"]}, {"prizes": 1, "tiers": 1})
+        draw["tiers"] = document_tiers(legacy)
+        index = build_ticket_index(document_prizes(legacy))
+    return index
+
+@router.get("/live")
+async def live_updates(request: Request):
+    """Server-Sent Events: pushes new prize numbers as soon as a draw update is saved"""
+    queue = broadcaster.subscribe()
+
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                    yield format_sse(event)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=headers)
+
+@router.get("/live/stats")
+async def get_live_stats():
+    return broadcaster.stats()
+
+@router.get("/check")
+async def check_ticket(ticket: str, code: str = Query(None), last: int = Query(1, ge=1, le=50)):
+    """Checks a ticket against one draw (by code) or against the last N draws"""
+    normalized = normalize_ticket(ticket)
+    if not normalized:
+        return {"error": "Invalid ticket number. Expected format like 'RH 700044'."}
+
+    projection = {"name": 1, "code": 1, "draw_date": 1, "ticket_index": 1, **CHECK_TIERS_PROJECTION}
+    if code:
+        draws = await collection.find({"code": code}, projection).to_list(1)
+    else:
+        draws = await collection.find({}, projection).sort("iso_date", -1).to_list(last)
+
+    if not draws:
+        return {"error": "Result not found"}
+
+    checked = []
+    for draw in draws:
+        index = await _load_ticket_index(draw)
+        labels = tier_labels(draw["tiers"])
+        matches = lookup_ticket(index, normalized)
+        checked.append({
+            "name": draw.get("name"),
+            "code": draw.get("code"),
+            "draw_date": draw.get("draw_date"),
+            "won": bool(matches),
+            "prizes": [{"label": labels[tier][0], "tier": tier} for tier in matches]
+        })
+
+    return {"ticket": normalized, "results": checked}
+
+@router.post("/check/bulk")
+async def check_tickets_bulk(request: BulkCheckRequest):
+    """Checks a whole batch (or book range) of tickets against one or more draws"""
+    too_many = {"error": f"Too many tickets. Maximum is {MAX_BULK_TICKETS} per request."}
+    if len(request.tickets) > MAX_BULK_TICKETS:
+        return too_many
+    codes = list(dict.fromkeys(request.codes))
+    if len(codes) > MAX_BULK_CODES:
+        return {"error": f"Too many draws. Maximum is {MAX_BULK_CODES} codes per request."}
+
+    # 1. SIZE the ranges from their bounds before expanding anything
+    ranges = []
+    invalid_ranges = []
+    total = len(request.tickets)
+    for spec in request.ranges:
+        parsed = parse_ticket_range(spec)
+        if not parsed:
+            invalid_ranges.append(spec)
+            continue
+        size = parsed[2] - parsed[1] + 1
+        if size > MAX_RANGE_TICKETS:
+            return {"error": f"Range {spec} is too large. Maximum is {MAX_RANGE_TICKETS} tickets per range."}
+        total += size
+        if total > MAX_BULK_TICKETS:
+            return too_many
+        ranges.append(parsed)
+
+    if total * len(codes) > MAX_BULK_CHECKS:
+        return {"error": f"Too many tickets for {len(codes)} draws. "
+                         f"Maximum is {MAX_BULK_CHECKS} tickets x draws per request."}
+
+    # 2. EXPAND (now bounded by MAX_BULK_TICKETS)
+    tickets = set()
+    invalid = []
+    for ticket in request.tickets:
+        normalized = normalize_ticket(ticket)
+        if normalized:
+            tickets.add(normalized)
+        else:
+            invalid.append(ticket)
+
+    invalid.extend(invalid_ranges)
+
+    for series, start, end in ranges:
+        tickets.update(f"{series} {number:06d}" for number in range(start, end + 1))
+
+    # Load every requested draw's index in a single query
+    projection = {"name": 1, "code": 1, "draw_date": 1, "ticket_index": 1, **CHECK_TIERS_PROJECTION}
+    draws = await collection.find({"code": {"$in": codes}}, projection).to_list(None)
+
+    winners = []
+    for draw in draws:
+        index = await _load_ticket_index(draw)
+        labels = tier_labels(draw["tiers"])
+
+        for ticket, tiers in match_tickets(index, tickets).items():
+            for tier in tiers:
+                label, amount = labels[tier]
+                winners.append({
+                    "ticket": ticket,
+                    "code": draw.get("code"),
+                    "draw_date": draw.get("draw_date"),
+                    "label": label,
+                    "tier": tier,
+                    "amount": amount
+                })
+
+    found_codes = {draw.get("code") for draw in draws}
+    winners.sort(key=lambda w: (w["code"], w["tier"] or 1.5, w["ticket"]))
+    return {
+        "checked": len(tickets),
+        "codes_not_found": [code for code in codes if code not in found_codes],
+        "invalid": invalid,
+        "winners": winners
+    }
+
 @router.get("/lottery-types")
-async def get_lottery_types():
+async def get_lottery_types(request: Request):
+    payload = response_cache.get(LOTTERY_TYPES_KEY)
+    if payload is not None:
+        return conditional_response(request, payload, LOTTERY_TYPES_CACHE_CONTROL)
+
     # This finds every unique "name" in your database automatically
     types = await collection.distinct("name")
-    return types
+    payload = make_payload(types)
+    response_cache.set(LOTTERY_TYPES_KEY, payload, LOTTERY_TYPES_TTL)
+    return conditional_response(request, payload, LOTTERY_TYPES_CACHE_CONTROL)
 
-@router.get("/fix-database-dates")
-async def fix_database_dates():
-    all_results = await collection.find({}).to_list(None)
-    count = 0
-    
-    for result in all_results:
-        if "draw_date" in result:
-            try:
-                # --- FIX: Changed '-' to '/' below ---
-                real_date = datetime.strptime(result["draw_date"], "%d/%m/%Y")
-                
-                await collection.update_one(
-                    {"_id": result["_id"]},
-                    {"$set": {"iso_date": real_date}}
-                )
-                count += 1
-            except Exception as e:
-                print(f"Skipping {result.get('code')}: {e}")
-                
-    return {"message": f"Successfully updated {count} records."}
\ No newline at end of file
+async def _stats_response(request: Request, cache_key: tuple, build):
+    """Encodes a statistic once per rollup revision (saves and rebuilds drop the cached copy)"""
+    payload = response_cache.get(cache_key)
+    if payload is None:
+        data = await build()
+        if data is None:
+            return {"error": "No statistics yet"}
+        payload = make_payload(data)
+        response_cache.set(cache_key, payload, STATS_TTL)
+    return conditional_response(request, payload, STATS_CACHE_CONTROL)
+
+@router.get("/stats/hot-cold")
+async def get_hot_cold_numbers(request: Request, name: str = None, limit: int = Query(10, ge=1, le=100)):
+    """Most and least recently drawn last-4 numbers, overall or for one lottery"""
+    async def build():
+        rollup = await load_rollup(name, {"draws": 1, "suffix": 1, "last_seen": 1})
+        return hot_cold_numbers(rollup, limit) if rollup else None
+    return await _stats_response(request, stats_key("hot-cold", name, limit), build)
+
+@router.get("/stats/digits")
+async def get_digit_frequency(request: Request, name: str = None):
+    """Digit counts per position of the winning last-4 numbers"""
+    async def build():
+        rollup = await load_rollup(name, {"suffix": 1})
+        return digit_frequency(rollup) if rollup else None
+    return await _stats_response(request, stats_key("digits", name), build)
+
+@router.get("/stats/series")
+async def get_series_frequency(request: Request, name: str = None):
+    """How often each series won the 1st prize"""
+    async def build():
+        rollup = await load_rollup(name, {"series": 1})
+        return series_frequency(rollup) if rollup else None
+    return await _stats_response(request, stats_key("series", name), build)
+
+@router.get("/stats/trends")
+async def get_lottery_trends(request: Request):
+    """Draw counts, date span and favourite 1st prize series per lottery"""
+    return await _stats_response(request, stats_key("trends"), lottery_trends)
+
+@router.post("/admin/stats/rebuild", dependencies=ADMIN)
+async def trigger_stats_rebuild(background_tasks: BackgroundTasks):
+    """Recomputes the statistics rollups from the whole archive in the background"""
+    if stats_progress.get("running"):
+        return {"message": "Stats rebuild already running", "progress": stats_progress}
+    background_tasks.add_task(rebuild_stats_rollups)
+    return {"message": "Stats rebuild started", "status_url": "/api/admin/stats/status"}
+
+@router.get("/admin/stats/status")
+async def get_stats_rebuild_status():
+    return stats_progress or {"running": False, "message": "Never run"}
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters of the read-endpoint cache"""
+    return response_cache.stats()
+
+@router.get("/diagnostics/query-plans")
+async def get_query_plans():
+    """explain() summaries for the queries behind the read routes"""
+    return await explain_route_queries()
+
+@router.get("/metrics")
+async def get_metrics():
+    """Prometheus text format: route, MongoDB, upstream and PDF latencies, cache hits (this process only)"""
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
+@router.post("/admin/indexes/ensure", dependencies=ADMIN)
+async def trigger_ensure_indexes():
+    """Creates the results indexes (what startup does outside Vercel)"""
+    await ensure_indexes()
+    return {"message": "Indexes ensured"}
+
+@router.get("/upstream/stats")
+async def get_upstream_stats():
+    """Per-host latency of upstream fetches made through the shared client"""
+    from app.http_client import timing_report
+    return timing_report()
+
+@router.get("/sources/stats")
+async def get_source_stats():
+    """Which result source (API or official PDF) succeeds and wins the race, per weekday"""
+    from app.sources import source_stats
+    return await source_stats()
+
+@router.post("/admin/backfill", dependencies=ADMIN)
+async def trigger_backfill(
+    background_tasks: BackgroundTasks,
+    restart: bool = Query(False),
+    concurrency: int = Query(4, ge=1, le=16),
+    page_size: int = Query(50, ge=1, le=200)
+):
+    """Starts loading the full upstream history in the background (resumes from the checkpoint)"""
+    from app.backfill import run_backfill, backfill_progress
+    if backfill_progress.get("running"):
+        return {"message": "Backfill already running", "progress": backfill_progress}
+    background_tasks.add_task(run_backfill, page_size=page_size, concurrency=concurrency, restart=restart)
+    return {"message": "Backfill started"}
+
+@router.get("/admin/backfill/status")
+async def get_backfill_status():
+    from app.backfill import backfill_progress
+    return backfill_progress
+
+@router.post("/fix-database-dates", dependencies=ADMIN)
+async def fix_database_dates(background_tasks: BackgroundTasks):
+    """Recomputes iso_date from draw_date for documents where it is missing or wrong"""
+    return _start_migration(FIX_ISO_DATE, background_tasks)
+
+@router.get("/migrations/{name}")
+async def get_migration_status(name: str):
+    if name not in MIGRATIONS:
+        return {"error": "Unknown migration"}
+    return migration_progress.get(name, {"running": False, "message": "Never run"})
+
+@router.post("/migrations/{name}/run", dependencies=ADMIN)
+async def trigger_migration(name: str, background_tasks: BackgroundTasks):
+    if name not in MIGRATIONS:
+        return {"error": "Unknown migration"}
+    return _start_migration(MIGRATIONS[name], background_tasks)
+
+def _start_migration(migration, background_tasks: BackgroundTasks):
+    if migration_progress.get(migration.name, {}).get("running"):
+        return {"message": f"Migration {migration.name} already running", "progress": migration_progress[migration.name]}
+    background_tasks.add_task(run_migration, migration)
+    return {"message": f"Migration {migration.name} started", "status_url": f"/api/migrations/{migration.name}"}
@@ -0,0 +1,110 @@
+import os
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+IST = ZoneInfo("Asia/Kolkata")
+
+# Results come out prize by prize after the 3 PM draw; poll fast only then.
+LIVE_WINDOW_START = os.getenv("LIVE_WINDOW_START", "14:45")   # IST, HH:MM
+LIVE_WINDOW_END = os.getenv("LIVE_WINDOW_END", "17:30")
+FAST_INTERVAL_SECONDS = int(os.getenv("SCRAPE_FAST_INTERVAL", "20"))
+SLOW_INTERVAL_SECONDS = int(os.getenv("SCRAPE_SLOW_INTERVAL", "900"))
+
+# Off by default on Vercel, where no process outlives a request
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "0" if os.getenv("VERCEL") else "1") == "1"
+
+JOB_ID = "daily-scrape"
+
+# APScheduler and the scrape stack are imported when the scheduler starts,
+# so importing this module (e.g. for /scheduler/status) stays cheap on Vercel
+_scheduler = None
+_status = {
+    "enabled": SCHEDULER_ENABLED,
+    "running": False,
+    "runs": 0,
+    "skipped": 0,
+    "errors": 0,
+    "interval_seconds": None,
+    "next_run_at": None,
+    "last_run_at": None,
+    "last_duration_ms": None,
+    "last_result": None
+}
+
+
+def _in_live_window(now: datetime) -> bool:
+    current = now.strftime("%H:%M")
+    return LIVE_WINDOW_START <= current < LIVE_WINDOW_END
+
+
+def next_interval(now: datetime = None) -> int:
+    """Seconds until the next poll: fast inside the live window, slow outside it."""
+    now = now or datetime.now(IST)
+    if _in_live_window(now):
+        return FAST_INTERVAL_SECONDS
+
+    # Never sleep through the start of the window
+    start_hour, start_minute = map(int, LIVE_WINDOW_START.split(":"))
+    window_start = now.replace(hour=start_hour, minute=start_minute, second=0, microsecond=0)
+    if window_start <= now:
+        window_start += timedelta(days=1)
+    return max(1, min(SLOW_INTERVAL_SECONDS, int((window_start - now).total_seconds())))
+
+
+def _schedule_next(delay_seconds: int):
+    if _scheduler is None:
+        # Shut down while a tick was running
+        return
+    from apscheduler.triggers.date import DateTrigger
+    run_at = datetime.now(IST) + timedelta(seconds=delay_seconds)
+    # Each run schedules the next one, so a run must never be dropped as misfired
+    # (default grace is 1s): a late tick still runs, and only once
+    _scheduler.add_job(_tick, DateTrigger(run_date=run_at), id=JOB_ID, replace_existing=True,
+                       misfire_grace_time=None, coalesce=True)
+    _status["interval_seconds"] = delay_seconds
+    _status["next_run_at"] = run_at
+
+
+async def _tick():
+    from app.scrape_jobs import run_daily_scrape_exclusive
+    started = time.perf_counter()
+    _status["running"] = True
+    try:
+        result = await run_daily_scrape_exclusive(owner="scheduler")
+        if result.get("status") == "skipped":
+            _status["skipped"] += 1
+        _status["last_result"] = result
+    except Exception as e:
+        _status["errors"] += 1
+        _status["last_result"] = {"status": "error", "message": str(e)}
+        print(f"❌ Scheduled scrape failed: {e}")
+    finally:
+        _status["running"] = False
+        _status["runs"] += 1
+        _status["last_run_at"] = datetime.now(IST)
+        _status["last_duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        _schedule_next(next_interval())
+
+
+def start_scheduler():
+    global _scheduler
+    if not SCHEDULER_ENABLED or _scheduler is not None:
+        return
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    _scheduler = AsyncIOScheduler(timezone=IST)
+    _scheduler.start()
+    _schedule_next(next_interval())
+    print(f"⏰ Scrape scheduler started (every {FAST_INTERVAL_SECONDS}s between "
+          f"{LIVE_WINDOW_START}-{LIVE_WINDOW_END} IST, up to {SLOW_INTERVAL_SECONDS}s otherwise).")
+
+
+def stop_scheduler():
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.shutdown(wait=False)
+        _scheduler = None
+
+
+def scheduler_status() -> dict:
+    return dict(_status)
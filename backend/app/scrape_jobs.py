@@ -0,0 +1,121 @@
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+import pytz
+from pymongo.errors import DuplicateKeyError
+
+from app.database import state_collection
+from app.india_lottery_api import fetch_api_latest
+from app.ingest import save_if_changed, load_scrape_state
+from app.sources import race_sources
+
+# Mongo lease so concurrent pollers (workers, Vercel Cron) never scrape twice at once
+LEASE_ID = "scrape_lease"
+LEASE_SECONDS = 120
+# The PDF leg alone can retry for minutes on a slow government site; the race is cut
+# off well before the lease expires, so another poller can never start alongside it
+RACE_TIMEOUT_SECONDS = min(float(os.getenv("SCRAPE_RACE_TIMEOUT", "90")), LEASE_SECONDS - 15)
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+async def run_daily_scrape():
+    """
+    One polling round for today's draw (Vercel Cron and the background scheduler).
+    Until the API has served today's draw, the API and the official PDF are
+    raced and the first one with today's draw wins; after that only the API
+    is polled, conditionally.
+    """
+    ist = pytz.timezone('Asia/Kolkata')
+    today_str = datetime.now(ist).strftime("%d/%m/%Y")
+    
+    print(f"🕒 [{datetime.now(ist).strftime('%H:%M:%S')}] Cron job running for {today_str}...")
+
+    # 1. CONTINUE SCRAPING: We no longer stop if data exists, so live data updates can flow in
+    # existing = await collection.find_one({"draw_date": today_str})
+    # if existing:
+    #     # print(f"✅ SUCCESS: Results for {today_str} already exist in DB. Skipping task.")
+    #     # return
+
+    state = await load_scrape_state()
+    api_served_today = state.get("api_draw_date") == today_str
+
+    # 2. API ALREADY SERVED TODAY: a conditional API poll is all that is needed
+    #    (the PDF has nothing newer to offer)
+    if api_served_today:
+        print(f"📡 Polling India Lottery API for {today_str}...")
+        live_result = await fetch_api_latest(etag=state.get("etag"))
+
+        if live_result.get("status") == "not_modified":
+            msg = f"💤 NOT MODIFIED: API results for {today_str} unchanged since last poll."
+            print(msg)
+            return {"status": "success", "message": msg, "source": "API", "changed": False}
+
+        live_data = live_result.get("data")
+        if live_result.get("status") == "success" and live_data and live_data.get("draw_date") == today_str:
+            changed = await save_if_changed(live_data, "API", state, etag=live_result.get("etag"))
+            msg = f"⚡ API UPDATE: Fetched {'and saved ' if changed else ''}results for {today_str}."
+            print(msg)
+            return {"status": "success", "message": msg, "source": "API", "changed": changed}
+
+        msg = f"✅ API already served {today_str}. Skipping Official PDF fallback."
+        print(msg)
+        return {"status": "success", "message": msg, "source": "API", "changed": False}
+
+    # --- RACE BOTH SOURCES (API not ready yet): first one with today's draw wins ---
+    print(f"📡 Racing India Lottery API and Official PDF for {today_str}...")
+    try:
+        winner = await asyncio.wait_for(race_sources(today_str, state), timeout=RACE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        msg = f"⏱️ TIMEOUT: No source returned {today_str} within {RACE_TIMEOUT_SECONDS:.0f}s."
+        print(msg)
+        return {"status": "pending", "message": msg}
+
+    # 3. DATE VERIFICATION happens inside the race: only today's draw can win
+    if winner:
+        source = winner["source"]
+        changed = await save_if_changed(winner["data"], source, state, etag=winner["etag"])
+        merged = f" (merged tiers from {', '.join(winner['merged_from'])})" if winner["merged_from"] else ""
+        msg = f"🏁 {source} WON in {winner['elapsed_ms']} ms: {'Saved' if changed else 'Unchanged'} results for {today_str}{merged}."
+        print(msg)
+        return {"status": "success", "message": msg, "source": source, "changed": changed,
+                "merged_from": winner["merged_from"]}
+
+    msg = f"⏳ NOT READY: Neither API nor Official PDF results available for {today_str} yet."
+    print(msg)
+    return {"status": "pending", "message": msg}
+
+
+async def acquire_lease(owner: str) -> bool:
+    """Takes the scrape lease unless another owner holds an unexpired one."""
+    now = datetime.utcnow()
+    try:
+        await state_collection.find_one_and_update(
+            {"_id": LEASE_ID, "$or": [{"expires_at": {"$lte": now}}, {"owner": owner}]},
+            {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=LEASE_SECONDS)}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        # The lease document exists and someone else holds it
+        return False
+
+
+async def release_lease(owner: str):
+    await state_collection.update_one(
+        {"_id": LEASE_ID, "owner": owner},
+        {"$set": {"expires_at": datetime.utcnow()}}
+    )
+
+
+async def run_daily_scrape_exclusive(owner: str = None) -> dict:
+    # Unique per run: two overlapping requests in the same worker must not share the lease
+    owner = f"{owner or 'poller'}@{INSTANCE_ID}:{uuid.uuid4().hex[:8]}"
+    if not await acquire_lease(owner):
+        return {"status": "skipped", "message": "Another scrape is already running."}
+    try:
+        return await run_daily_scrape()
+    finally:
+        await release_lease(owner)
@@ -1,12 +1,33 @@
+import os
 import httpx
 from bs4 import BeautifulSoup
 from pypdf import PdfReader
-import io
 import re
 import asyncio
+import tempfile
+import time
 from datetime import datetime
+from app.http_client import get_client
+from app.metrics import PDF_STAGE_SECONDS
 
-BASE_URL = "https://statelottery.kerala.gov.in/English/index.php/lottery-result-view"
+# Overridable so staging and the load benchmark can point at a local stand-in
+BASE_URL = os.getenv("KERALA_RESULTS_URL", "https://statelottery.kerala.gov.in/English/index.php/lottery-result-view")
+
+# Result PDFs are a few hundred KB; anything bigger goes to a temp file
+PDF_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+# Everything after this footer is boilerplate the parser never reads
+PDF_END_MARKER = "The prize winners"
+
+def extract_pdf_text(pdf_file) -> str:
+    """Extracts page text up to (and including) the page with the prize-winners footer."""
+    reader = PdfReader(pdf_file)
+    pages = []
+    for page in reader.pages:
+        text = page.extract_text()
+        pages.append(text)
+        if PDF_END_MARKER in text:
+            break
+    return "".join(pages)
 
 async def fetch_latest_results():
     # Set a generous timeout for government servers
@@ -17,61 +38,184 @@ async def fetch_latest_results():
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
     }
     
+    # Shared pooled client; the government site gets its own timeout and headers per request
+    client = get_client()
+    request_options = {"timeout": timeout, "headers": headers, "follow_redirects": True}
+
     # Retry logic: Try 3 times before giving up
     for attempt in range(3):
-        async with httpx.AsyncClient(timeout=timeout, headers=headers, follow_redirects=True) as client:
-            try:
-                print(f"🔄 Attempt {attempt + 1}: Fetching Kerala Lottery results...")
-                response = await client.get(BASE_URL)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # 1. Find the first 'View' link in the results table
-                # The site uses a specific table structure; we look for the first link with 'View' text
-                view_link = soup.find('a', string=re.compile(r'View', re.I))
-                if not view_link:
-                    print("⚠️ Could not find any result links on the page.")
-                    return None
-                
-                pdf_url = view_link['href']
-                # If the URL is relative, join it with the base
-                if not pdf_url.startswith('http'):
-                    pdf_url = "https://statelottery.kerala.gov.in/English/" + pdf_url
-
-                print(f"📄 Found PDF URL: {pdf_url}")
-
-                # 2. Download the PDF
-                pdf_response = await client.get(pdf_url)
-                pdf_response.raise_for_status()
-                
-                # 3. Parse PDF Text
-                pdf_file = io.BytesIO(pdf_response.content)
-                reader = PdfReader(pdf_file)
-                full_text = ""
-                for page in reader.pages:
-                    full_text += page.extract_text()
-                
-                # 4. Use our regex parser logic
-                return parse_lottery_text(full_text)
-
-            except (httpx.ReadTimeout, httpx.ConnectTimeout):
-                print(f"⏳ Timeout on attempt {attempt + 1}. Retrying in 5 seconds...")
-                await asyncio.sleep(5)
-                continue
-            except Exception as e:
-                print(f"❌ Scraper Error: {e}")
+        try:
+            print(f"🔄 Attempt {attempt + 1}: Fetching Kerala Lottery results...")
+            response = await client.get(BASE_URL, **request_options)
+            response.raise_for_status()
+            
+            soup = BeautifulSoup(response.text, 'html.parser')
+            
+            # 1. Find the first 'View' link in the results table
+            # The site uses a specific table structure; we look for the first link with 'View' text
+            view_link = soup.find('a', string=re.compile(r'View', re.I))
+            if not view_link:
+                print("⚠️ Could not find any result links on the page.")
                 return None
-                
+            
+            pdf_url = view_link['href']
+            # If the URL is relative, join it with the base
+            if not pdf_url.startswith('http'):
+                pdf_url = "https://statelottery.kerala.gov.in/English/" + pdf_url
+
+            print(f"📄 Found PDF URL: {pdf_url}")
+
+            # 2. Stream the PDF to a spooled buffer (spills to disk if it is unusually large)
+            with tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_BYTES) as pdf_file:
+                started = time.perf_counter()
+                async with client.stream("GET", pdf_url, **request_options) as pdf_response:
+                    pdf_response.raise_for_status()
+                    async for chunk in pdf_response.aiter_bytes():
+                        pdf_file.write(chunk)
+                pdf_file.seek(0)
+                PDF_STAGE_SECONDS.observe(time.perf_counter() - started, "download")
+
+                # 3. Parse PDF Text in a worker thread so the event loop keeps serving requests
+                started = time.perf_counter()
+                full_text = await asyncio.to_thread(extract_pdf_text, pdf_file)
+                PDF_STAGE_SECONDS.observe(time.perf_counter() - started, "extract")
+            
+            # 4. Use our regex parser logic
+            started = time.perf_counter()
+            data = parse_lottery_text(full_text)
+            PDF_STAGE_SECONDS.observe(time.perf_counter() - started, "parse")
+            return data
+
+        except (httpx.ReadTimeout, httpx.ConnectTimeout):
+            print(f"⏳ Timeout on attempt {attempt + 1}. Retrying in 5 seconds...")
+            await asyncio.sleep(5)
+            continue
+        except Exception as e:
+            print(f"❌ Scraper Error: {e}")
+            return None
+            
     print("🛑 Max retries reached. Kerala Lottery site is likely down.")
     return {"error": "All attempts failed due to timeout"}
 
+# --- Precompiled patterns for parse_lottery_text (compiled once at import) ---
+NAME_PATTERN = re.compile(r"(?:EMAIL:.*?\s+)?([A-Z\s\-]{3,})\s+LOTTERY NO", re.DOTALL)
+CODE_PATTERN = re.compile(r"NO\.([A-Z0-9\-]+)")
+DATE_PATTERN = re.compile(r"held on:-\s+(\d{2}/\d{2}/\d{4})")
+LABEL_PATTERN = re.compile(r"(.*?Prize.*?/-)")
+FIRST_WINNER_PATTERN = re.compile(r"1\)\s+([A-Z]{2}\s\d{6})")
+LABEL_AMOUNT_PATTERN = re.compile(r":(\d+)/-")
+# Series tickets ("RH 700044") and standalone 4-digit numbers, in one alternation
+NUMBER_TOKEN_PATTERN = re.compile(r"\b(?:([A-Z]{2}\s\d{6})|(\d{4}))\b")
+ORDINAL_SUFFIXES = ("st", "nd", "rd", "th")
+CONS_MARKER = "Cons Prize-Rs :"
+
+def _heading_start(text, prize_at):
+    """
+    If the 'Prize' at prize_at closes an 'Nth Prize' heading (digits, ordinal
+    suffix, whitespace), returns where the heading starts, else -1.
+    """
+    i = prize_at
+    while i > 0 and text[i - 1].isspace():
+        i -= 1
+    if i == prize_at or i < 3 or text[i - 2:i] not in ORDINAL_SUFFIXES:
+        return -1
+    i -= 2
+    digits_end = i
+    while i > 0 and text[i - 1].isdecimal():
+        i -= 1
+    return i if i < digits_end else -1
+
+def split_prize_blocks(text):
+    """
+    Splits the result text into prize blocks in one left-to-right pass.
+    Each block runs from an 'Nth Prize' heading to the next heading, the
+    prize-winners footer, or the end of the text.
+    """
+    # 1. Boundaries: headings (found from their 'Prize' word) and footers, in text order
+    boundaries = []
+    at = text.find("Prize")
+    while at != -1:
+        start = _heading_start(text, at)
+        if start != -1:
+            boundaries.append((start, True))
+        at = text.find("Prize", at + 5)
+
+    at = text.find(PDF_END_MARKER)
+    while at != -1:
+        boundaries.append((at, False))
+        at = text.find(PDF_END_MARKER, at + len(PDF_END_MARKER))
+    boundaries.sort()
+
+    # 2. Cut the blocks. Like a non-MULTILINE '$', the text ends before one trailing newline
+    text_end = len(text) - 1 if text.endswith("\n") else len(text)
+    blocks = []
+    block_start = None
+    for position, is_heading in boundaries:
+        if block_start is not None:
+            blocks.append(text[block_start:position])
+        block_start = position if is_heading else None
+
+    if block_start is not None:
+        blocks.append(text[block_start:text_end])
+    return blocks
+
+def scan_numbers(block, start=0):
+    """
+    One scan over a block, returning (tickets, four_digit_numbers): series
+    tickets like "RH 700044" and standalone 4-digit low-tier numbers.
+    """
+    tickets = []
+    four_digits = []
+    for ticket, four_digit in NUMBER_TOKEN_PATTERN.findall(block, start):
+        if ticket:
+            tickets.append(ticket)
+        else:
+            four_digits.append(four_digit)
+    return tickets, four_digits
+
+def parse_prize_block(block, prizes):
+    """Adds the winners of one prize block to `prizes` (label -> numbers)."""
+    # Extract the Label (e.g., 1st Prize Rs :10000000/-)
+    label_match = LABEL_PATTERN.match(block)
+    if not label_match:
+        return
+
+    label = label_match.group(1).strip()
+
+    # --- SPECIAL HANDLING FOR 1ST PRIZE & CONSOLATION ---
+    if "1st Prize" in label:
+        # Find the single 1st Prize winner (after the '1)')
+        first_winner = FIRST_WINNER_PATTERN.search(block)
+        if first_winner:
+            prizes[label] = [first_winner.group(1)]
+
+        # Find all Consolation Prizes in this same block
+        cons_at = block.find(CONS_MARKER)
+        if cons_at != -1:
+            cons_numbers, _ = scan_numbers(block, cons_at + len(CONS_MARKER))
+            if cons_numbers:
+                prizes["Consolation Prize"] = cons_numbers
+        return
+
+    # --- HANDLING OTHER PRIZES (2nd, 3rd, 4th, etc.) ---
+    # High-value formats (Series + 6 digits) win over plain 4-digit numbers
+    high_val, all_nums = scan_numbers(block)
+    if high_val:
+        prizes[label] = high_val
+        return
+
+    # Filter out the prize amount if it is the first 4-digit number of the block
+    prize_amount_match = LABEL_AMOUNT_PATTERN.search(label)
+    if prize_amount_match and all_nums and all_nums[0] == prize_amount_match.group(1):
+        all_nums = all_nums[1:]
+    prizes[label] = all_nums
+
 def parse_lottery_text(text):
     try:
         # 1. Metadata Extraction
-        name_match = re.search(r"(?:EMAIL:.*?\s+)?([A-Z\s\-]{3,})\s+LOTTERY NO", text, re.DOTALL)
-        code_match = re.search(r"NO\.([A-Z0-9\-]+)", text)
-        date_match = re.search(r"held on:-\s+(\d{2}/\d{2}/\d{4})", text)
+        name_match = NAME_PATTERN.search(text)
+        code_match = CODE_PATTERN.search(text)
+        date_match = DATE_PATTERN.search(text)
 
         data = {
             "name": name_match.group(1).strip() if name_match else "Unknown",
@@ -91,55 +235,11 @@ def parse_lottery_text(text):
             data["iso_date"] = datetime.now()
         # --------------------------------------------------
 
-        # 2. DYNAMIC PRIZE PARSING
-        prize_blocks = re.findall(r"(\d+(?:st|nd|rd|th)\s+Prize.*?)(?=\d+(?:st|nd|rd|th)\s+Prize|The prize winners|$)", text, re.DOTALL)
-
-        for block in prize_blocks:
-            # Extract the Label (e.g., 1st Prize Rs :10000000/-)
-            label_match = re.match(r"(.*?Prize.*?/-)", block)
-            if not label_match:
-                continue
-                
-            label = label_match.group(1).strip()
-            
-            # --- SPECIAL HANDLING FOR 1ST PRIZE & CONSOLATION ---
-            if "1st Prize" in label:
-                # Find the single 1st Prize winner (after the '1)')
-                first_winner = re.search(r"1\)\s+([A-Z]{2}\s\d{6})", block)
-                if first_winner:
-                    data["prizes"][label] = [first_winner.group(1)]
-                
-                # Find all Consolation Prizes in this same block
-                cons_block = re.search(r"Cons Prize-Rs :.*?\n?(.*)", block, re.DOTALL)
-                if cons_block:
-                    cons_numbers = re.findall(r"\b[A-Z]{2}\s\d{6}\b", cons_block.group(1))
-                    if cons_numbers:
-                        data["prizes"]["Consolation Prize"] = cons_numbers
-                continue
-
-            # --- HANDLING OTHER PRIZES (2nd, 3rd, 4th, etc.) ---
-            # Check for high-value formats (Series + 6 digits)
-            high_val = re.findall(r"\b[A-Z]{2}\s\d{6}\b", block)
-            
-            if high_val:
-                data["prizes"][label] = high_val
-            else:
-                # Low-value: Find ALL 4-digit numbers
-                all_nums = re.findall(r"\b\d{4}\b", block)
-                
-                # Check for prize amount in label to avoid duplicates
-                prize_amount_match = re.search(r":(\d+)/-", label)
-                if prize_amount_match and all_nums:
-                    amount = prize_amount_match.group(1)
-                    # Filter out the amount if it's the first element in the numbers list
-                    if all_nums[0] == amount:
-                        data["prizes"][label] = all_nums[1:]
-                    else:
-                        data["prizes"][label] = all_nums
-                else:
-                    data["prizes"][label] = all_nums
+        # 2. DYNAMIC PRIZE PARSING (single pass over the block boundaries)
+        for block in split_prize_blocks(text):
+            parse_prize_block(block, data["prizes"])
 
         return data
     except Exception as e:
         print(f"❌ Final Parsing Error: {e}")
-        return None
\ No newline at end of file
+        return None
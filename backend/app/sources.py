@@ -0,0 +1,172 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+
+import pytz
+
+from app.database import state_collection
+from app.india_lottery_api import fetch_api_latest
+from app.metrics import SOURCE_OUTCOMES, SOURCE_SECONDS, log_event
+from app.scrapper import fetch_latest_results
+from app.ticket_index import prize_tier
+
+IST = pytz.timezone("Asia/Kolkata")
+
+# How long the loser may keep running after the winner, so its extra tiers can be merged
+MERGE_GRACE_SECONDS = float(os.getenv("SOURCE_MERGE_GRACE", "1.5"))
+
+# Per-source latency and outcomes, bucketed by weekday (persisted across restarts)
+SOURCE_STATS_ID = "source_stats"
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+async def _api_source(state: dict):
+    result = await fetch_api_latest(etag=state.get("etag"))
+    if result.get("status") == "success":
+        return result["data"], result.get("etag")
+    return None, None
+
+
+async def _pdf_source(state: dict):
+    return await fetch_latest_results(), None
+
+
+SOURCES = {"API": _api_source, "PDF": _pdf_source}
+
+
+async def _timed(source: str, state: dict):
+    started = time.perf_counter()
+    try:
+        data, etag = await SOURCES[source](state)
+    except Exception as e:
+        print(f"❌ Source {source} failed: {e}")
+        data, etag = None, None
+    return {"source": source, "data": data, "etag": etag,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+def merge_prizes(primary: dict, secondary: dict) -> dict:
+    """Primary prizes, plus the tiers only the secondary source has (matched by tier, not label text)."""
+    known_tiers = {prize_tier(label) for label in primary}
+    merged = dict(primary)
+    for label, numbers in secondary.items():
+        if prize_tier(label) not in known_tiers:
+            merged[label] = numbers
+    return merged
+
+
+async def race_sources(today_str: str, state: dict, sources=None) -> dict:
+    """
+    Starts every source at once and takes the first one that returns today's
+    draw. Sources finishing within MERGE_GRACE_SECONDS fill in missing tiers;
+    the rest are cancelled. Returns None when no source has today's draw.
+    """
+    sources = sources or list(SOURCES)
+    tasks = {asyncio.create_task(_timed(source, state)) for source in sources}
+    outcomes = []
+    winner = None
+
+    try:
+        pending = tasks
+        while pending and not winner:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                outcome = task.result()
+                outcome["valid"] = bool(outcome["data"]) and outcome["data"].get("draw_date") == today_str
+                outcomes.append(outcome)
+                if outcome["valid"] and not winner:
+                    winner = outcome
+
+        if winner and pending:
+            done, pending = await asyncio.wait(pending, timeout=MERGE_GRACE_SECONDS)
+            for task in done:
+                outcome = task.result()
+                outcome["valid"] = bool(outcome["data"]) and outcome["data"].get("draw_date") == today_str
+                outcomes.append(outcome)
+    finally:
+        # 1. CANCEL THE LOSERS (e.g. the PDF path sleeping between retries)
+        cancelled = [task for task in tasks if not task.done()]
+        for task in cancelled:
+            task.cancel()
+        await asyncio.gather(*cancelled, return_exceptions=True)
+
+    finished = {outcome["source"] for outcome in outcomes}
+    losers = [source for source in sources if source not in finished]
+    await record_source_stats(outcomes, winner, losers)
+
+    if not winner:
+        return None
+
+    # 2. MERGE the tiers only the other (same draw) sources delivered
+    data = dict(winner["data"])
+    merged_from = []
+    for outcome in outcomes:
+        if outcome is winner or not outcome["valid"] or outcome["data"].get("code") != data.get("code"):
+            continue
+        prizes = merge_prizes(data.get("prizes", {}), outcome["data"].get("prizes", {}))
+        if len(prizes) > len(data.get("prizes", {})):
+            data["prizes"] = prizes
+            merged_from.append(outcome["source"])
+
+    return {
+        "source": winner["source"],
+        "data": data,
+        "etag": winner["etag"],
+        "elapsed_ms": winner["elapsed_ms"],
+        "merged_from": merged_from,
+        "cancelled": losers
+    }
+
+
+async def record_source_stats(outcomes: list, winner: dict, cancelled: list):
+    weekday = WEEKDAYS[datetime.now(IST).weekday()]
+    increments = {}
+    for outcome in outcomes:
+        SOURCE_SECONDS.observe(outcome["elapsed_ms"] / 1000, outcome["source"])
+        label = "won" if outcome is winner else "valid" if outcome["valid"] else "missed"
+        SOURCE_OUTCOMES.inc(outcome["source"], label)
+
+        prefix = f"{outcome['source']}.{weekday}"
+        increments[f"{prefix}.attempts"] = 1
+        increments[f"{prefix}.total_ms"] = outcome["elapsed_ms"]
+        if outcome["valid"]:
+            increments[f"{prefix}.successes"] = 1
+        if outcome is winner:
+            increments[f"{prefix}.wins"] = 1
+    for source in cancelled:
+        SOURCE_OUTCOMES.inc(source, "cancelled")
+        increments[f"{source}.{weekday}.attempts"] = 1
+        increments[f"{source}.{weekday}.cancelled"] = 1
+
+    log_event("source_race", winner=winner["source"] if winner else None, cancelled=cancelled,
+              sources={outcome["source"]: {"ms": outcome["elapsed_ms"], "valid": outcome["valid"]} for outcome in outcomes})
+
+    try:
+        await state_collection.update_one({"_id": SOURCE_STATS_ID}, {"$inc": increments}, upsert=True)
+    except Exception as e:
+        # Stats must never fail a scrape
+        print(f"⚠️ Could not record source stats: {e}")
+
+
+async def source_stats() -> dict:
+    """Success rate, win rate and mean latency per source and weekday."""
+    document = await state_collection.find_one({"_id": SOURCE_STATS_ID}) or {}
+    report = {}
+    for source in SOURCES:
+        report[source] = {}
+        for weekday in WEEKDAYS:
+            counts = document.get(source, {}).get(weekday)
+            if not counts:
+                continue
+            attempts = counts.get("attempts", 0)
+            # Cancelled runs never finished, so they carry no latency
+            finished = attempts - counts.get("cancelled", 0)
+            report[source][weekday] = {
+                "attempts": attempts,
+                "success_rate": round(counts.get("successes", 0) / finished, 3) if finished else None,
+                "win_rate": round(counts.get("wins", 0) / attempts, 3) if attempts else None,
+                "cancelled": counts.get("cancelled", 0),
+                "avg_ms": round(counts.get("total_ms", 0) / finished, 1) if finished else None
+            }
+    return report
@@ -0,0 +1,255 @@
+import time
+from collections import Counter
+from datetime import datetime
+
+from app.cache import invalidate_stats
+from app.database import collection, stats_collection
+from app.prize_schema import SERIES_BASE, document_tiers, series_letters
+
+# One rollup document for the whole archive, plus one per lottery name:
+#   {draws, first_draw, last_draw,
+#    suffix: {"0044": times drawn}, last_seen: {"0044": iso_date}, series: {"RH": 1st prizes}}
+ALL_ROLLUP_ID = "all"
+
+stats_progress = {}
+
+
+def rollup_id(name: str = None) -> str:
+    return f"name:{name.strip().upper()}" if name else ALL_ROLLUP_ID
+
+
+def draw_contribution(tiers: list):
+    """
+    What one draw adds to the rollups: last-4 digits of every winning number
+    (consolation excluded, it repeats the 1st prize) and the 1st prize series.
+    """
+    suffixes = Counter()
+    series = Counter()
+    for entry in tiers:
+        tier = entry["tier"]
+        if not tier:
+            continue
+        for packed in entry.get("tickets", []):
+            suffixes[f"{packed % 10_000:04d}"] += 1
+            if tier == 1:
+                series[series_letters(packed // SERIES_BASE)] += 1
+        for suffix in entry.get("suffixes", []):
+            suffixes[f"{suffix:04d}"] += 1
+    return suffixes, series
+
+
+def _counter_delta(before: Counter, after: Counter, field: str) -> dict:
+    delta = {}
+    for key in before.keys() | after.keys():
+        change = after[key] - before[key]
+        if change:
+            delta[f"{field}.{key}"] = change
+    return delta
+
+
+async def update_stats_rollups(document: dict, previous: dict):
+    """
+    Applies one upsert of a built document to the rollups. previous is the BEFORE
+    image (None on insert), so re-saving a draw during the live updates only adds the difference.
+    """
+    before_suffixes, before_series = draw_contribution(document_tiers(previous) if previous else [])
+    after_suffixes, after_series = draw_contribution(document["tiers"])
+
+    increments = {
+        **_counter_delta(before_suffixes, after_suffixes, "suffix"),
+        **_counter_delta(before_series, after_series, "series")
+    }
+    if previous is None:
+        increments["draws"] = 1
+    if not increments:
+        return
+
+    update = {"$inc": increments}
+    iso_date = document.get("iso_date")
+    if iso_date:
+        update["$max"] = {"last_draw": iso_date, **{f"last_seen.{suffix}": iso_date for suffix in after_suffixes}}
+        update["$min"] = {"first_draw": iso_date}
+
+    from pymongo import UpdateOne
+    try:
+        await stats_collection.bulk_write([
+            UpdateOne({"_id": ALL_ROLLUP_ID}, update, upsert=True),
+            UpdateOne({"_id": rollup_id(document["name"])}, {**update, "$set": {"name": document["name"]}}, upsert=True)
+        ], ordered=False)
+        invalidate_stats()
+    except Exception as e:
+        # Rollups can always be rebuilt; never fail the save over them
+        print(f"⚠️ Could not update stats rollups for {document.get('code')}: {e}")
+
+
+# Winning numbers as rows, computed server-side from the stored tiers
+_NUMBERS_PIPELINE = [
+    {"$project": {"name": {"$toUpper": "$name"}, "iso_date": 1, "tiers": 1}},
+    {"$unwind": "$tiers"},
+    # Numbered tiers only (Consolation is tier 0)
+    {"$match": {"tiers.tier": {"$gte": 1}}},
+    {"$project": {"name": 1, "iso_date": 1, "numbers": {"$concatArrays": [
+        {"$map": {"input": {"$ifNull": ["$tiers.tickets", []]}, "as": "packed", "in": {
+            "suffix": {"$mod": ["$$packed", 10_000]},
+            "series": {"$cond": [
+                {"$eq": ["$tiers.tier", 1]}, {"$floor": {"$divide": ["$$packed", SERIES_BASE]}}, None
+            ]}
+        }}},
+        {"$map": {"input": {"$ifNull": ["$tiers.suffixes", []]}, "as": "suffix", "in": {
+            "suffix": "$$suffix", "series": None
+        }}}
+    ]}}},
+    {"$unwind": "$numbers"},
+    {"$group": {
+        "_id": {"name": "$name", "suffix": "$numbers.suffix", "series": "$numbers.series"},
+        "count": {"$sum": 1},
+        "last_seen": {"$max": "$iso_date"}
+    }}
+]
+
+_DRAWS_PIPELINE = [
+    {"$group": {
+        "_id": {"$toUpper": "$name"},
+        "name": {"$last": "$name"},
+        "draws": {"$sum": 1},
+        "first_draw": {"$min": "$iso_date"},
+        "last_draw": {"$max": "$iso_date"}
+    }}
+]
+
+
+def _empty_rollup(name: str = None) -> dict:
+    rollup = {"draws": 0, "first_draw": None, "last_draw": None, "suffix": {}, "last_seen": {}, "series": {}}
+    if name:
+        rollup["name"] = name
+    return rollup
+
+
+def _merge_draw_counts(rollup: dict, row: dict):
+    rollup["draws"] += row["draws"]
+    for field, pick in (("first_draw", min), ("last_draw", max)):
+        values = [value for value in (rollup[field], row[field]) if value]
+        rollup[field] = pick(values) if values else None
+
+
+def _merge_number_row(rollup: dict, row: dict):
+    suffix, series = row["_id"].get("suffix"), row["_id"].get("series")
+    suffix = f"{int(suffix):04d}" if suffix is not None else None
+    series = series_letters(series) if series is not None else None
+    if suffix:
+        rollup["suffix"][suffix] = rollup["suffix"].get(suffix, 0) + row["count"]
+        seen = rollup["last_seen"].get(suffix)
+        if row["last_seen"] and (not seen or row["last_seen"] > seen):
+            rollup["last_seen"][suffix] = row["last_seen"]
+    if series:
+        rollup["series"][series] = rollup["series"].get(series, 0) + row["count"]
+
+
+async def rebuild_stats_rollups() -> dict:
+    """
+    Recomputes every rollup from the archive with two aggregation pipelines.
+    Needed once for existing data and after writes that bypass save_result (backfill).
+    Draws still in the old label-keyed shape are skipped until normalize-prizes has run.
+    """
+    if stats_progress.get("running"):
+        return dict(stats_progress)
+
+    stats_progress.clear()
+    stats_progress.update({"running": True, "started_at": datetime.utcnow()})
+    started = time.perf_counter()
+
+    try:
+        rollups = {ALL_ROLLUP_ID: _empty_rollup()}
+        async for row in collection.aggregate(_DRAWS_PIPELINE):
+            _merge_draw_counts(rollups[ALL_ROLLUP_ID], row)
+            if row["_id"]:
+                rollups[rollup_id(row["_id"])] = _empty_rollup(row["name"])
+                _merge_draw_counts(rollups[rollup_id(row["_id"])], row)
+
+        rows = 0
+        async for row in collection.aggregate(_NUMBERS_PIPELINE, allowDiskUse=True):
+            rows += 1
+            _merge_number_row(rollups[ALL_ROLLUP_ID], row)
+            if row["_id"].get("name"):
+                _merge_number_row(rollups[rollup_id(row["_id"]["name"])], row)
+
+        from pymongo import ReplaceOne
+        await stats_collection.bulk_write(
+            [ReplaceOne({"_id": key}, rollup, upsert=True) for key, rollup in rollups.items()],
+            ordered=False
+        )
+        # Names that no longer exist in the archive
+        await stats_collection.delete_many({"_id": {"$nin": list(rollups)}})
+        invalidate_stats()
+
+        stats_progress.update({"rollups": len(rollups), "rows": rows})
+        print(f"✅ Stats rollups rebuilt: {len(rollups)} rollups from {rows} aggregated rows.")
+    except Exception as e:
+        stats_progress["error"] = str(e)
+        print(f"❌ Stats rebuild failed: {e}")
+    finally:
+        stats_progress["running"] = False
+        stats_progress["elapsed_seconds"] = round(time.perf_counter() - started, 2)
+
+    return dict(stats_progress)
+
+
+async def load_rollup(name: str = None, projection: dict = None) -> dict:
+    return await stats_collection.find_one({"_id": rollup_id(name)}, projection)
+
+
+def hot_cold_numbers(rollup: dict, limit: int) -> dict:
+    """Most drawn last-4 numbers, and the drawn ones not seen for the longest time."""
+    counts = rollup.get("suffix", {})
+    last_seen = rollup.get("last_seen", {})
+    drawn = [suffix for suffix, count in counts.items() if count > 0]
+
+    hot = sorted(drawn, key=lambda suffix: (-counts[suffix], suffix))[:limit]
+    cold = sorted(drawn, key=lambda suffix: (last_seen.get(suffix) or datetime.min, counts[suffix]))[:limit]
+    return {
+        "draws": rollup.get("draws", 0),
+        "hot": [{"number": s, "count": counts[s], "last_seen": last_seen.get(s)} for s in hot],
+        "cold": [{"number": s, "count": counts[s], "last_seen": last_seen.get(s)} for s in cold],
+        "never_drawn": 10_000 - len(drawn)
+    }
+
+
+def digit_frequency(rollup: dict) -> dict:
+    """How often each digit appears at each of the 4 positions of the winning last-4 numbers."""
+    positions = [[0] * 10 for _ in range(4)]
+    total = 0
+    for suffix, count in rollup.get("suffix", {}).items():
+        if count <= 0:
+            continue
+        total += count
+        for position, digit in enumerate(suffix):
+            positions[position][int(digit)] += count
+    return {"numbers": total, "positions": positions}
+
+
+def series_frequency(rollup: dict) -> list:
+    """1st prize series ranked by how often they won."""
+    series = {key: count for key, count in rollup.get("series", {}).items() if count > 0}
+    total = sum(series.values())
+    return [
+        {"series": key, "count": count, "share": round(count / total, 4)}
+        for key, count in sorted(series.items(), key=lambda item: (-item[1], item[0]))
+    ]
+
+
+async def lottery_trends(top: int = 3) -> list:
+    """Per lottery name: draw count, date span and its most frequent 1st prize series."""
+    cursor = stats_collection.find(
+        {"_id": {"$ne": ALL_ROLLUP_ID}},
+        {"name": 1, "draws": 1, "first_draw": 1, "last_draw": 1, "series": 1}
+    ).sort("draws", -1)
+    trends = []
+    async for rollup in cursor:
+        trends.append({
+            "name": rollup.get("name"),
+            "draws": rollup.get("draws", 0),
+            "first_draw": rollup.get("first_draw"),
+            "last_draw": rollup.get("last_draw"),
+            "top_series": series_frequency(rollup)[:top]
+        })
+    return trends
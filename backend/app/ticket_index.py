@@ -0,0 +1,123 @@
+import re
+
+# Full tickets look like "RH 700044" (2-letter series + 6 digits)
+TICKET_PATTERN = re.compile(r"^([A-Z]{2})\s*(\d{6})$")
+TIER_PATTERN = re.compile(r"^\s*(\d+)(?:st|nd|rd|th)\b", re.I)
+# Ranges look like "RH 700000-700999" (optionally repeating the series)
+RANGE_PATTERN = re.compile(r"^([A-Z]{2})\s*(\d{6})\s*-\s*(?:[A-Z]{2}\s*)?(\d{6})$")
+AMOUNT_PATTERN = re.compile(r"Rs\.?\s*:?\s*([\d,]+)", re.I)
+
+def normalize_ticket(ticket: str):
+    """Normalizes user input like 'rh700044' to 'RH 700044'. Returns None if invalid."""
+    match = TICKET_PATTERN.match(ticket.strip().upper())
+    if not match:
+        return None
+    return f"{match.group(1)} {match.group(2)}"
+
+
+def prize_tier(label: str):
+    """Returns the tier number of a prize label (Consolation = 0)."""
+    if label.lower().startswith("consolation"):
+        return 0
+    match = TIER_PATTERN.match(label)
+    return int(match.group(1)) if match else None
+
+
+def parse_ticket_range(spec: str):
+    """'RH 700000-700999' -> ('RH', 700000, 700999), without expanding it. Returns None if invalid."""
+    match = RANGE_PATTERN.match(spec.strip().upper())
+    if not match:
+        return None
+    series, start, end = match.group(1), int(match.group(2)), int(match.group(3))
+    if end < start:
+        return None
+    return series, start, end
+
+
+def expand_ticket_range(spec: str) -> list:
+    """Expands 'RH 700000-700999' into every ticket of the book. Returns [] if invalid."""
+    parsed = parse_ticket_range(spec)
+    if not parsed:
+        return []
+    series, start, end = parsed
+    return [f"{series} {number:06d}" for number in range(start, end + 1)]
+
+
+def prize_amount(label: str):
+    """Extracts the rupee amount from labels like '4th Prize Rs :5000/-' or '1st Prize Rs 1,00,00,000'."""
+    match = AMOUNT_PATTERN.search(label)
+    if not match:
+        return None
+    digits = match.group(1).replace(",", "")
+    return int(digits) if digits else None
+
+
+def first_prize(prizes: dict):
+    """Returns {'label', 'numbers'} of the 1st prize, denormalized for listing views."""
+    for label, numbers in prizes.items():
+        if prize_tier(label) == 1:
+            return {"label": label, "numbers": numbers}
+    return None
+
+
+def build_ticket_index(prizes: dict) -> dict:
+    """
+    Precomputes the lookup tables used by the ticket checker.
+    'full' maps "RH 700044" -> [tiers], 'suffix' maps "0044" -> [tiers].
+    The winning number's format decides the match, not the tier: bumper
+    draws print full tickets for their 4th and 5th prizes too.
+    """
+    full = {}
+    suffix = {}
+
+    for label, numbers in prizes.items():
+        tier = prize_tier(label)
+        if tier is None:
+            continue
+
+        for number in numbers:
+            number = number.strip()
+            ticket = normalize_ticket(number)
+            if ticket:
+                full.setdefault(ticket, []).append(tier)
+            elif len(number) == 4 and number.isdigit():
+                suffix.setdefault(number, []).append(tier)
+
+    return {"full": full, "suffix": suffix}
+
+
+def _tier_rank(tier: int) -> float:
+    # Consolation ranks right after the 1st prize
+    return tier or 1.5
+
+
+def lookup_ticket(index: dict, ticket: str) -> list:
+    """O(1) check of a normalized ticket against a prebuilt index. Returns the winning tiers."""
+    tiers = index.get("full", {}).get(ticket, []) + index.get("suffix", {}).get(ticket[-4:], [])
+    return sorted(tiers, key=_tier_rank)
+
+
+def match_tickets(index: dict, tickets: set) -> dict:
+    """
+    Matches a whole batch of normalized tickets against one draw's index.
+    Returns {ticket: [tiers]} for the winners only, tiers ordered like lookup_ticket.
+    """
+    full = index.get("full", {})
+    suffix = index.get("suffix", {})
+    matches = {}
+
+    # 1. High tiers: plain set intersection on the full ticket
+    for ticket in full.keys() & tickets:
+        matches[ticket] = list(full[ticket])
+
+    # 2. Lower tiers: intersect on the last 4 digits, then map back to tickets
+    winning_suffixes = suffix.keys() & {ticket[-4:] for ticket in tickets}
+    if winning_suffixes:
+        for ticket in tickets:
+            tiers = suffix.get(ticket[-4:]) if ticket[-4:] in winning_suffixes else None
+            if tiers:
+                matches.setdefault(ticket, []).extend(tiers)
+
+    for tiers in matches.values():
+        tiers.sort(key=_tier_rank)
+    return matches
@@ -0,0 +1,64 @@
+"""
+Throughput of the bulk ticket checker (tickets/second).
+
+Run from the backend folder:
+    python -m benchmarks.bench_bulk_check --batch 10000 --rounds 50
+"""
+import argparse
+import random
+import time
+
+from app.ticket_index import build_ticket_index, expand_ticket_range, match_tickets
+
+SERIES = ["RA", "RB", "RC", "RD", "RE", "RF", "RG", "RH", "RJ", "RK", "RL", "RM"]
+
+
+def synthetic_prizes(seed: int = 42) -> dict:
+    """Builds a draw with a realistic Kerala prize structure."""
+    rng = random.Random(seed)
+    first_number = rng.randint(0, 999999)
+
+    def tickets(count):
+        return [f"{rng.choice(SERIES)} {rng.randint(0, 999999):06d}" for _ in range(count)]
+
+    def suffixes(count):
+        return [f"{n:04d}" for n in rng.sample(range(10000), count)]
+
+    return {
+        "1st Prize Rs 10000000": [f"RH {first_number:06d}"],
+        "Consolation Prize": [f"{s} {first_number:06d}" for s in SERIES if s != "RH"],
+        "2nd Prize Rs 3000000": tickets(1),
+        "3rd Prize Rs 500000": tickets(12),
+        "4th Prize Rs 5000": suffixes(18),
+        "5th Prize Rs 2000": suffixes(18),
+        "6th Prize Rs 1000": suffixes(36),
+        "7th Prize Rs 500": suffixes(84),
+        "8th Prize Rs 200": suffixes(90),
+        "9th Prize Rs 100": suffixes(138),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    index = build_ticket_index(synthetic_prizes())
+    tickets = set(expand_ticket_range(f"RH 100000-{100000 + args.batch - 1:06d}"))
+
+    winners = 0
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        winners = len(match_tickets(index, tickets))
+    elapsed = time.perf_counter() - start
+
+    checked = len(tickets) * args.rounds
+    print(f"Batch size:   {len(tickets)} tickets ({winners} winners per batch)")
+    print(f"Rounds:       {args.rounds}")
+    print(f"Per batch:    {elapsed / args.rounds * 1000:.2f} ms")
+    print(f"Throughput:   {checked / elapsed:,.0f} tickets/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Cold start of the API, as a serverless invocation sees it.
+
+Every run is a fresh interpreter that imports main, runs the app lifespan and
+serves one request through plain ASGI calls (no HTTP client, so nothing extra
+gets imported). Reported per phase (median / p90):
+  import   - `import main`
+  startup  - the lifespan up to the first request
+  request  - the first request itself
+  process  - the whole child process, interpreter start to exit
+It also lists which parts of the scraper stack the child ended up loading, and
+with --profile prints a `python -X importtime` breakdown by top-level package.
+
+Run from the backend folder:
+    python -m benchmarks.bench_cold_start --runs 15 --profile
+    python -m benchmarks.bench_cold_start --path "/api/results?limit=100" --mongo-uri mongodb://localhost:27017
+    python -m benchmarks.bench_cold_start --app-dir /tmp/older-checkout    # same measurement on another tree
+Without --mongo-uri the request is served from an empty mongomock database
+(mongomock itself is loaded before the request timer starts).
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Only the scrape routes need these
+SCRAPER_STACK = ("httpx", "bs4", "pypdf", "apscheduler", "app.scrapper", "app.http_client")
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+async def _asgi_get(app, target: str) -> tuple:
+    path, _, query = target.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 50000), "server": ("localhost", 80)
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    body = b"".join(message.get("body", b"") for message in messages if message["type"] == "http.response.body")
+    return messages[0]["status"], len(body)
+
+
+def run_child(target: str, use_mongomock: bool):
+    """One cold start, reported as a JSON line on stdout."""
+    started = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+
+    if use_mongomock:
+        from mongomock_motor import AsyncMongoMockClient
+        from app import database
+        database._client = AsyncMongoMockClient()
+
+    async def serve():
+        startup_started = time.perf_counter()
+        async with main.app.router.lifespan_context(main.app):
+            request_started = time.perf_counter()
+            status, size = await _asgi_get(main.app, target) if target else (None, 0)
+            finished = time.perf_counter()
+        return request_started - startup_started, finished - request_started, status, size
+
+    startup, request, status, size = asyncio.run(serve())
+    loaded = [name for name in SCRAPER_STACK if name in sys.modules]
+    # The app prints; keep the report on its own last line
+    print("\n" + json.dumps({
+        "import_ms": (imported - started) * 1000, "startup_ms": startup * 1000, "request_ms": request * 1000,
+        "status": status, "bytes": size, "loaded": loaded, "modules": len(sys.modules)
+    }))
+
+
+def spawn(args) -> dict:
+    env = {**os.environ, "SCHEDULER_ENABLED": "0", "LIVE_CHANGE_STREAM": "0", "PYTHONDONTWRITEBYTECODE": "0"}
+    if args.mongo_uri:
+        env["MONGO_URI"] = args.mongo_uri
+    if args.vercel:
+        env["VERCEL"] = "1"
+    command = [sys.executable, os.path.abspath(__file__), "--child", "--path", args.path]
+    if not args.mongo_uri:
+        command.append("--mongomock")
+
+    started = time.perf_counter()
+    completed = subprocess.run(command, cwd=args.app_dir, env=env, capture_output=True, text=True)
+    elapsed = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        sys.exit(f"❌ Cold start failed:\n{completed.stderr[-2000:]}")
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    report["process_ms"] = elapsed
+    return report
+
+
+def import_profile(app_dir: str, top: int):
+    """Self time per top-level package while importing main, from `python -X importtime`."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                               cwd=app_dir, capture_output=True, text=True,
+                               env={**os.environ, "SCHEDULER_ENABLED": "0"})
+    per_package = defaultdict(int)
+    total = 0
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, name = int(match.group(1)), match.group(4)
+        per_package[name.split(".")[0]] += self_us
+        total += self_us
+
+    print(f"\nImport profile of main ({total / 1000:.0f} ms self time in total):")
+    for package, self_us in sorted(per_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {package:28} {self_us / 1000:8.1f} ms  {self_us / total:6.1%}")
+
+
+def _percentile(values: list, share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--path", default="/api/results?summary=true&limit=20",
+                        help="first request of every cold start ('' to stop after the lifespan)")
+    parser.add_argument("--mongo-uri", help="real MongoDB instead of an empty mongomock database")
+    parser.add_argument("--vercel", action="store_true", help="run with VERCEL=1 (index bootstrap off)")
+    parser.add_argument("--app-dir", default=BACKEND_DIR, help="backend folder to measure")
+    parser.add_argument("--profile", action="store_true", help="also print an import-time breakdown")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--mongomock", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, os.getcwd())
+        run_child(args.path, args.mongomock)
+        return
+
+    spawn(args)   # warm the OS file cache and bytecode, like a reused container image
+    reports = [spawn(args) for _ in range(args.runs)]
+
+    print(f"Cold starts: {args.runs} x GET {args.path or '(none)'} "
+          f"[{'mongodb' if args.mongo_uri else 'mongomock'}{', VERCEL=1' if args.vercel else ''}]")
+    print(f"{'phase':10} {'median ms':>10} {'p90 ms':>10}")
+    for phase in ("import", "startup", "request", "process"):
+        values = [report[f"{phase}_ms"] for report in reports]
+        print(f"{phase:10} {statistics.median(values):>10.1f} {_percentile(values, 0.9):>10.1f}")
+
+    last = reports[-1]
+    print(f"status {last['status']}, {last['bytes']} bytes, {last['modules']} modules loaded")
+    print(f"scraper stack loaded: {', '.join(last['loaded']) or 'none'}")
+
+    if args.profile:
+        import_profile(args.app_dir, args.top)
+
+
+if __name__ == "__main__":
+    main()
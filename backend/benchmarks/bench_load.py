@@ -0,0 +1,326 @@
+"""
+Load test of the API: throughput and p50/p95/p99 per endpoint.
+
+Boots main:app on a local port against a synthetic multi-year archive
+(mongomock by default, or a real MongoDB with --mongo-uri, using a separate
+database) and the mock upstreams from benchmarks.mock_upstream, then drives
+each scenario at a fixed concurrency.
+
+Every run is appended to benchmarks/results/load_history.jsonl together with
+the commit it ran on, and compared with the last run that used the same
+settings, so regressions show up between commits.
+
+Run from the backend folder:
+    python -m benchmarks.bench_load --years 3 --concurrency 16 --requests 2000
+    python -m benchmarks.bench_load --mongo-uri mongodb://localhost:27017 --scenarios results,result
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, NamedTuple
+
+import httpx
+import uvicorn
+
+from benchmarks.mock_upstream import create_mock_upstream, synthetic_draw
+
+HISTORY_FILE = os.path.join(os.path.dirname(__file__), "results", "load_history.jsonl")
+
+# One lottery per weekday, like the Kerala schedule
+LOTTERIES = [("WIN-WIN", "W"), ("STHREE SAKTHI", "SS"), ("AKSHAYA", "AK"), ("KARUNYA PLUS", "KN"),
+             ("NIRMAL", "NR"), ("KARUNYA", "KR"), ("SAMRUDHI", "SM")]
+
+
+class Scenario(NamedTuple):
+    name: str
+    path: Callable[[random.Random], str]
+    outcome: bool = False      # also count the JSON "status" of each answer
+
+
+def build_scenarios(codes: list) -> dict:
+    names = [name for name, _ in LOTTERIES]
+    scenarios = [
+        Scenario("results", lambda rng: "/api/results?limit=20"),
+        Scenario("results_summary", lambda rng: "/api/results?summary=true&limit=20"),
+        Scenario("results_by_name", lambda rng: f"/api/results?limit=20&name={rng.choice(names)}"),
+        Scenario("result", lambda rng: f"/api/results/{rng.choice(codes)}"),
+        Scenario("lottery_types", lambda rng: "/api/lottery-types"),
+        Scenario("cron", lambda rng: "/api/cron/daily-scrape", outcome=True),
+    ]
+    return {scenario.name: scenario for scenario in scenarios}
+
+
+async def seed_archive(collection, years: int) -> list:
+    """One draw per day for the given number of years, stored exactly as ingest stores them."""
+    from app.india_lottery_api import transform_api_response
+    from app.ingest import build_document
+
+    await collection.delete_many({})
+    today = datetime.now()
+    documents, codes = [], []
+    counters = Counter()
+    for day in range(years * 365, 0, -1):
+        draw_date = today - timedelta(days=day)
+        name, prefix = LOTTERIES[draw_date.weekday()]
+        counters[prefix] += 1
+        raw = synthetic_draw(draw_date, seed=day)
+        raw["draw_name"], raw["draw_code"] = name, f"{prefix}-{counters[prefix]}"
+        documents.append(build_document(transform_api_response(raw)))
+        codes.append(raw["draw_code"])
+
+    for start in range(0, len(documents), 500):
+        await collection.insert_many(documents[start:start + 500])
+    return codes
+
+
+def use_database(db):
+    """Points every loaded app module that holds a collection handle at the benchmark database."""
+    handles = {"collection": "results", "state_collection": "scraper_state", "stats_collection": "stats_rollups"}
+    for name, module in list(sys.modules.items()):
+        if name == "app" or name.startswith("app."):
+            for attribute, collection_name in handles.items():
+                if hasattr(module, attribute):
+                    setattr(module, attribute, db[collection_name])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(asgi_app, port: int, setup=None) -> uvicorn.Server:
+    """Runs an ASGI app in a background thread with its own event loop; setup() runs on that loop first."""
+    server = uvicorn.Server(uvicorn.Config(asgi_app, host="127.0.0.1", port=port,
+                                           log_level="warning", access_log=False))
+
+    async def serve():
+        if setup:
+            await setup()
+        await server.serve()
+
+    thread = threading.Thread(target=lambda: asyncio.run(serve()), daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Server on port {port} failed to start")
+        time.sleep(0.05)
+    server.thread = thread
+    return server
+
+
+def stop_server(server: uvicorn.Server):
+    server.should_exit = True
+    server.thread.join(timeout=10)
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def drive(base_url: str, scenario: Scenario, concurrency: int, total: int, warmup: int, seed: int) -> dict:
+    """Sends `total` requests with `concurrency` in flight; returns the latency summary."""
+    rng = random.Random(seed)
+    latencies = []
+    statuses = Counter()
+    outcomes = Counter()
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        for _ in range(warmup):
+            await client.get(scenario.path(rng))
+
+        remaining = total
+
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    response = await client.get(scenario.path(rng))
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[response.status_code] += 1
+                if response.status_code >= 400:
+                    errors += 1
+                elif scenario.outcome:
+                    outcomes[response.json().get("status", "unknown")] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    summary = {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2),
+        "errors": errors,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())}
+    }
+    if outcomes:
+        summary["outcomes"] = dict(outcomes)
+    return summary
+
+
+def git_revision() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True).stdout.strip())
+        return {"commit": commit or None, "dirty": dirty}
+    except OSError:
+        return {"commit": None, "dirty": None}
+
+
+def previous_run(config: dict):
+    if not os.path.exists(HISTORY_FILE):
+        return None
+    last = None
+    with open(HISTORY_FILE, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get("config") == config:
+                last = record
+    return last
+
+
+def save_run(record: dict):
+    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
+    with open(HISTORY_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def print_report(results: dict, baseline: dict):
+    base = baseline["scenarios"] if baseline else {}
+    if baseline:
+        print(f"Compared with {baseline['commit']}{' (dirty)' if baseline.get('dirty') else ''} at {baseline['at']}")
+    print(f"{'scenario':<18}{'reqs':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>8}"
+          f"{'Δp95':>9}{'Δreq/s':>9}")
+    for name, summary in results.items():
+        previous = base.get(name)
+        delta_p95 = f"{(summary['p95_ms'] / previous['p95_ms'] - 1) * 100:+.0f}%" if previous else "-"
+        delta_rps = f"{(summary['rps'] / previous['rps'] - 1) * 100:+.0f}%" if previous else "-"
+        print(f"{name:<18}{summary['requests']:>7}{summary['rps']:>9.1f}{summary['p50_ms']:>9.2f}"
+              f"{summary['p95_ms']:>9.2f}{summary['p99_ms']:>9.2f}{summary['max_ms']:>9.1f}{summary['errors']:>8}"
+              f"{delta_p95:>9}{delta_rps:>9}")
+        if summary.get("outcomes"):
+            print(f"{'':<18}outcomes: {summary['outcomes']}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", default="results,results_summary,results_by_name,result,lottery_types,cron")
+    parser.add_argument("--years", type=int, default=3, help="size of the synthetic archive")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="per scenario")
+    parser.add_argument("--cron-requests", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--api-delay", type=float, default=0.15, help="mock IndiaLotteryAPI latency (s)")
+    parser.add_argument("--pdf-delay", type=float, default=0.4, help="mock Kerala site latency (s)")
+    parser.add_argument("--api-stale", action="store_true", help="API serves yesterday, every cron races the PDF")
+    parser.add_argument("--mongo-uri", help="real MongoDB instead of mongomock")
+    parser.add_argument("--database", default="lottery_bench", help="database used with --mongo-uri (dropped first)")
+    parser.add_argument("--label", default="", help="free text stored with the run")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's own log output")
+    args = parser.parse_args()
+
+    # 1. CONFIGURE THE APP BEFORE IT IS IMPORTED (upstream URLs and Mongo are read at import time)
+    upstream_port, app_port = free_port(), free_port()
+    upstream_url = f"http://127.0.0.1:{upstream_port}"
+    os.environ["INDIA_LOTTERY_API_URL"] = f"{upstream_url}/wp-json/klr/v1"
+    os.environ["KERALA_RESULTS_URL"] = f"{upstream_url}/kerala/results"
+    os.environ["SCHEDULER_ENABLED"] = "0"
+    os.environ["LIVE_CHANGE_STREAM"] = "0"
+    if args.mongo_uri:
+        os.environ["MONGO_URI"] = args.mongo_uri
+
+    import main as app_main
+    from app import database
+    # Imported by the scrape routes on first use; load them now so use_database reaches them too
+    from app import backfill, scrape_jobs  # noqa: F401
+
+    if args.mongo_uri:
+        db = database.get_client().get_database(args.database)
+    else:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("mongomock-motor is not installed: pip install mongomock-motor, or pass --mongo-uri")
+        db = AsyncMongoMockClient()[args.database]
+    use_database(db)
+
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    config = {key: value for key, value in vars(args).items() if key not in ("label", "no_save", "verbose", "mongo_uri")}
+    config["backend"] = "mongodb" if args.mongo_uri else "mongomock"
+
+    # 2. BOOT the mock upstreams and the app (the archive is seeded on the app's own loop)
+    codes = []
+
+    async def seed():
+        if args.mongo_uri:
+            await database.get_client().drop_database(args.database)
+        started = time.perf_counter()
+        codes.extend(await seed_archive(db["results"], args.years))
+        print(f"🌱 Seeded {len(codes)} draws in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+    if not args.verbose:
+        # The structured event log (app/metrics.py) writes past redirect_stdout
+        logging.getLogger("lottery").setLevel(logging.CRITICAL)
+    results = {}
+    with output:
+        upstream = start_server(create_mock_upstream(upstream_url, args.api_delay, args.pdf_delay, args.api_stale),
+                                upstream_port)
+        server = start_server(app_main.app, app_port, setup=seed)
+        scenarios = build_scenarios(codes)
+
+        # 3. DRIVE each scenario in turn
+        try:
+            for name in selected:
+                if name not in scenarios:
+                    print(f"⚠️ Unknown scenario {name}, skipping", file=sys.stderr)
+                    continue
+                total = args.cron_requests if name == "cron" else args.requests
+                print(f"🚦 {name}: {total} requests at concurrency {args.concurrency}...", file=sys.stderr)
+                results[name] = asyncio.run(drive(
+                    f"http://127.0.0.1:{app_port}", scenarios[name], args.concurrency, total, args.warmup, seed=7
+                ))
+        finally:
+            stop_server(server)
+            stop_server(upstream)
+
+    # 4. REPORT and remember the run
+    baseline = previous_run(config)
+    print_report(results, baseline)
+    if not args.no_save:
+        save_run({**git_revision(), "at": datetime.now().isoformat(timespec="seconds"),
+                  "label": args.label, "config": config, "scenarios": results})
+        print(f"Saved to {os.path.relpath(HISTORY_FILE)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+parse_lottery_text: regression check and ops/sec against the original parser.
+
+Every file in the corpus (saved result PDFs, or their extracted text as .txt)
+is parsed by both implementations; any difference is printed and the script
+exits with status 1, so it doubles as the parser's regression suite.
+Without arguments it runs on benchmarks/corpus/: a result PDF and the extracted
+text of another, both rendered by benchmarks/mock_upstream.py in the official layout.
+
+Run from the backend folder:
+    python -m benchmarks.bench_parser
+    python -m benchmarks.bench_parser samples/*.pdf --seconds 2
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+from app.scrapper import extract_pdf_text, parse_lottery_text
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+
+def parse_lottery_text_original(text):
+    """The parser as it was before the single-pass rewrite, kept verbatim as the baseline."""
+    try:
+        # 1. Metadata Extraction
+        name_match = re.search(r"(?:EMAIL:.*?\s+)?([A-Z\s\-]{3,})\s+LOTTERY NO", text, re.DOTALL)
+        code_match = re.search(r"NO\.([A-Z0-9\-]+)", text)
+        date_match = re.search(r"held on:-\s+(\d{2}/\d{2}/\d{4})", text)
+
+        data = {
+            "name": name_match.group(1).strip() if name_match else "Unknown",
+            "code": code_match.group(1).strip() if code_match else "Unknown",
+            "draw_date": date_match.group(1).strip() if date_match else "Unknown",
+            "prizes": {}
+        }
+
+        try:
+            if data["draw_date"] != "Unknown":
+                data["iso_date"] = datetime.strptime(data["draw_date"], "%d/%m/%Y")
+            else:
+                data["iso_date"] = datetime.now()
+        except Exception as e:
+            print(f"⚠️ Date parsing failed in scraper: {e}")
+            data["iso_date"] = datetime.now()
+
+        # 2. DYNAMIC PRIZE PARSING
+        prize_blocks = re.findall(r"(\d+(?:st|nd|rd|th)\s+Prize.*?)(?=\d+(?:st|nd|rd|th)\s+Prize|The prize winners|$)", text, re.DOTALL)
+
+        for block in prize_blocks:
+            label_match = re.match(r"(.*?Prize.*?/-)", block)
+            if not label_match:
+                continue
+
+            label = label_match.group(1).strip()
+
+            if "1st Prize" in label:
+                first_winner = re.search(r"1\)\s+([A-Z]{2}\s\d{6})", block)
+                if first_winner:
+                    data["prizes"][label] = [first_winner.group(1)]
+
+                cons_block = re.search(r"Cons Prize-Rs :.*?\n?(.*)", block, re.DOTALL)
+                if cons_block:
+                    cons_numbers = re.findall(r"\b[A-Z]{2}\s\d{6}\b", cons_block.group(1))
+                    if cons_numbers:
+                        data["prizes"]["Consolation Prize"] = cons_numbers
+                continue
+
+            high_val = re.findall(r"\b[A-Z]{2}\s\d{6}\b", block)
+
+            if high_val:
+                data["prizes"][label] = high_val
+            else:
+                all_nums = re.findall(r"\b\d{4}\b", block)
+
+                prize_amount_match = re.search(r":(\d+)/-", label)
+                if prize_amount_match and all_nums:
+                    amount = prize_amount_match.group(1)
+                    if all_nums[0] == amount:
+                        data["prizes"][label] = all_nums[1:]
+                    else:
+                        data["prizes"][label] = all_nums
+                else:
+                    data["prizes"][label] = all_nums
+
+        return data
+    except Exception as e:
+        print(f"❌ Final Parsing Error: {e}")
+        return None
+
+
+def load_text(path: str) -> str:
+    if path.lower().endswith(".pdf"):
+        with open(path, "rb") as f:
+            return extract_pdf_text(f)
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def comparable(data):
+    # Without a draw date both parsers fall back to datetime.now()
+    if data and data.get("draw_date") == "Unknown":
+        data.pop("iso_date", None)
+    return data
+
+
+def ops_per_second(parse, text: str, seconds: float) -> float:
+    runs = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        parse(text)
+        runs += 1
+    return runs / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("corpus", nargs="*", help="result PDFs or extracted .txt files (default: benchmarks/corpus/)")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time budget per measurement")
+    args = parser.parse_args()
+    corpus = args.corpus or sorted(glob.glob(os.path.join(CORPUS_DIR, "*")))
+
+    failures = 0
+    print(f"{'file':<32}{'chars':>8}{'original ops/s':>16}{'single-pass ops/s':>19}{'speedup':>9}  identical")
+    for path in corpus:
+        text = load_text(path)
+        identical = comparable(parse_lottery_text_original(text)) == comparable(parse_lottery_text(text))
+        failures += not identical
+
+        before = ops_per_second(parse_lottery_text_original, text, args.seconds)
+        after = ops_per_second(parse_lottery_text, text, args.seconds)
+        print(f"{os.path.relpath(path)[-32:]:<32}{len(text):>8}{before:>16,.0f}{after:>19,.0f}{after / before:>8.1f}x  {identical}")
+
+    if failures:
+        print(f"❌ {failures} file(s) parsed differently")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
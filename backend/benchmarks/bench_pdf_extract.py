@@ -0,0 +1,73 @@
+"""
+Parse time and peak memory of the result-PDF extraction, before and after.
+
+"before" is the original path: the whole response body in a BytesIO and
+every page concatenated with +=. "after" is scrapper.extract_pdf_text on a
+spooled file, stopping at the prize-winners footer.
+
+Run from the backend folder with saved result PDFs:
+    python -m benchmarks.bench_pdf_extract samples/*.pdf --rounds 5
+"""
+import argparse
+import io
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from pypdf import PdfReader
+
+from app.scrapper import PDF_SPOOL_MAX_BYTES, extract_pdf_text, parse_lottery_text
+
+
+def extract_before(content: bytes) -> str:
+    pdf_file = io.BytesIO(content)
+    reader = PdfReader(pdf_file)
+    full_text = ""
+    for page in reader.pages:
+        full_text += page.extract_text()
+    return full_text
+
+
+def extract_after(content: bytes) -> str:
+    with tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_BYTES) as pdf_file:
+        # Simulates the streamed download: written chunk by chunk, never held twice
+        shutil.copyfileobj(io.BytesIO(content), pdf_file, 64 * 1024)
+        pdf_file.seek(0)
+        return extract_pdf_text(pdf_file)
+
+
+def measure(extract, content: bytes, rounds: int):
+    tracemalloc.start()
+    extract(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        text = extract(content)
+    elapsed = (time.perf_counter() - start) / rounds
+    return text, elapsed * 1000, peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pdfs", nargs="+")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'file':<32}{'pages':>6}{'before ms':>11}{'after ms':>10}{'before MB':>11}{'after MB':>10}  same")
+    for path in args.pdfs:
+        with open(path, "rb") as f:
+            content = f.read()
+        pages = len(PdfReader(io.BytesIO(content)).pages)
+
+        before_text, before_ms, before_mb = measure(extract_before, content, args.rounds)
+        after_text, after_ms, after_mb = measure(extract_after, content, args.rounds)
+        same = parse_lottery_text(before_text) == parse_lottery_text(after_text)
+
+        print(f"{path[-32:]:<32}{pages:>6}{before_ms:>11.1f}{after_ms:>10.1f}{before_mb:>11.2f}{after_mb:>10.2f}  {same}")
+
+
+if __name__ == "__main__":
+    main()
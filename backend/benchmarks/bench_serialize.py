@@ -0,0 +1,129 @@
+"""
+Serialization cost of the 100-draw /api/results listing: bytes/sec and CPU per request.
+
+Three paths over the same documents (as Motor returns them: ObjectId _id,
+datetime iso_date, normalized tiers):
+  before  - _id to str in a loop, jsonable_encoder + json.dumps (the old make_payload)
+  orjson  - encode_json straight from the documents (make_payload today)
+  cached  - a response-cache hit: the payload encoded once for this revision is reused
+The first two bodies must decode to the same JSON, else the script exits with status 1.
+
+Run from the backend folder:
+    python -m benchmarks.bench_serialize --rounds 200
+"""
+import argparse
+import hashlib
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from starlette.requests import Request
+
+from app.http_cache import RESULTS_CACHE_CONTROL, conditional_response, make_payload
+from app.india_lottery_api import transform_api_response
+from app.pagination import to_summary
+from app.prize_schema import normalize_prizes, to_api_shape
+from app.ticket_index import first_prize
+from benchmarks.mock_upstream import synthetic_draw
+
+LISTING_SIZE = 100
+
+
+def listing_documents(summary: bool) -> list:
+    """One page of newest-first draws in the stored shape, after the route's projection."""
+    documents = []
+    start = datetime(2026, 1, 1)
+    for i in range(LISTING_SIZE):
+        data = transform_api_response(synthetic_draw(start - timedelta(days=i), seed=i))
+        document = {"_id": ObjectId(), "name": data["name"], "code": f"{data['code']}-{i}",
+                    "draw_date": data["draw_date"], "iso_date": data["iso_date"]}
+        if summary:
+            document["first_prize"] = first_prize(data["prizes"])
+        else:
+            document["tiers"] = normalize_prizes(data["prizes"])
+        documents.append(document)
+    return documents
+
+
+def _reshape(documents: list, summary: bool) -> list:
+    # Fresh top-level dicts per request, like a new cursor; the reshaping only reassigns keys
+    rows = [dict(document) for document in documents]
+    for row in rows:
+        if summary:
+            to_summary(row)
+        else:
+            to_api_shape(row)
+    return rows
+
+
+def serialize_before(documents: list, summary: bool) -> bytes:
+    rows = [dict(document) for document in documents]
+    for row in rows:
+        row["_id"] = str(row["_id"])
+        if summary:
+            to_summary(row)
+        else:
+            to_api_shape(row)
+    body = json.dumps(jsonable_encoder(rows), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    hashlib.sha256(body).hexdigest()
+    return body
+
+
+def serialize_orjson(documents: list, summary: bool) -> bytes:
+    return make_payload(_reshape(documents, summary)).body
+
+
+def measure(serialize, rounds: int) -> dict:
+    serialize()   # warm up
+    wall_started, cpu_started = time.perf_counter(), time.process_time()
+    size = 0
+    for _ in range(rounds):
+        size = len(serialize())
+    wall = time.perf_counter() - wall_started
+    cpu = time.process_time() - cpu_started
+    return {
+        "bytes": size,
+        "cpu_ms": cpu / rounds * 1000,
+        "req_s": rounds / wall,
+        "mb_s": size * rounds / wall / 1_000_000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    request = Request({"type": "http", "method": "GET", "path": "/api/results", "headers": []})
+    failed = False
+
+    print(f"{'listing':10} {'path':8} {'bytes':>9} {'cpu ms/req':>11} {'req/s':>9} {'MB/s':>9}")
+    for summary in (False, True):
+        documents = listing_documents(summary)
+        before = serialize_before(documents, summary)
+        after = serialize_orjson(documents, summary)
+        if json.loads(before) != json.loads(after):
+            print(f"❌ {'summary' if summary else 'full'} listing: orjson body differs from the old encoder")
+            failed = True
+
+        payload = make_payload(_reshape(documents, summary))
+        paths = {
+            "before": lambda: serialize_before(documents, summary),
+            "orjson": lambda: serialize_orjson(documents, summary),
+            "cached": lambda: conditional_response(request, payload, RESULTS_CACHE_CONTROL).body
+        }
+        baseline = None
+        for name, serialize in paths.items():
+            result = measure(serialize, args.rounds)
+            baseline = baseline or result["cpu_ms"]
+            print(f"{'summary' if summary else 'full':10} {name:8} {result['bytes']:>9,} {result['cpu_ms']:>11.3f} "
+                  f"{result['req_s']:>9,.0f} {result['mb_s']:>9,.1f}   x{baseline / result['cpu_ms']:.1f}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
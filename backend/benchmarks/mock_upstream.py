@@ -0,0 +1,161 @@
+"""
+Local stand-in for both upstreams, used by the load benchmark:
+the IndiaLotteryAPI (/wp-json/klr/v1/...) and the Kerala results site
+(an HTML list page linking to a generated result PDF).
+
+Each upstream answers after a configurable delay, so the cron path sees
+realistic latencies without touching the real sites. It can also back a
+dev server on its own:
+    python -m benchmarks.mock_upstream --port 8100
+    INDIA_LOTTERY_API_URL=http://127.0.0.1:8100/wp-json/klr/v1 \
+    KERALA_RESULTS_URL=http://127.0.0.1:8100/kerala/results uvicorn main:app
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+from datetime import datetime, timedelta
+
+import pytz
+from fastapi import FastAPI, Request, Response
+
+IST = pytz.timezone("Asia/Kolkata")
+SERIES = ["RA", "RB", "RC", "RD", "RE", "RF", "RG", "RH", "RJ", "RK", "RL", "RM"]
+# (tier key, amount, how many numbers); tiers 2-3 are full tickets, the rest last-4 digits
+TIERS = [("2nd", 3000000, 1), ("3rd", 500000, 12), ("4th", 5000, 18), ("5th", 2000, 18),
+         ("6th", 1000, 36), ("7th", 500, 84), ("8th", 200, 90), ("9th", 100, 138)]
+
+
+def synthetic_draw(draw_date: datetime, seed: int = 1) -> dict:
+    """One draw in IndiaLotteryAPI format."""
+    rng = random.Random(seed)
+    first_number = rng.randint(0, 999999)
+    prizes = {"amounts": {"1st": "₹1,00,00,000/-", "consolation": "₹5,000/-"}}
+    prizes["consolation"] = [f"{series} {first_number:06d}" for series in SERIES if series != "RH"]
+    for key, amount, count in TIERS:
+        prizes["amounts"][key] = f"₹{amount:,}/-"
+        if key in ("2nd", "3rd"):
+            prizes[key] = [f"{rng.choice(SERIES)} {rng.randint(0, 999999):06d}" for _ in range(count)]
+        else:
+            prizes[key] = [f"{n:04d}" for n in rng.sample(range(10000), count)]
+    return {
+        "draw_date": draw_date.strftime("%Y-%m-%d"),
+        "draw_name": "SAMRUDHI",
+        "draw_code": f"SM-{seed}",
+        "first": {"ticket": f"RH {first_number:06d}"},
+        "prizes": prizes
+    }
+
+
+def _pdf_bytes(pages: list) -> bytes:
+    """Smallest PDF pypdf can read: one Helvetica text stream per page."""
+    body = {3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids = []
+    next_id = 4
+    for lines in pages:
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        kids.append(page_id)
+        escaped = (line.replace("(", "\\(").replace(")", "\\)") for line in lines)
+        stream = ("BT /F1 7 Tf 9 TL 30 820 Td " + " ".join(f"({line}) '" for line in escaped) + " ET").encode()
+        body[content_id] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        body[page_id] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                         b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+    body[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    body[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+
+    out = b"%PDF-1.4\n"
+    offsets = {}
+    for object_id in range(1, next_id):
+        offsets[object_id] = len(out)
+        out += b"%d 0 obj\n" % object_id + body[object_id] + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % next_id
+    out += b"".join(b"%010d 00000 n \n" % offsets[i] for i in range(1, next_id))
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (next_id, xref)
+    return out
+
+
+def result_pdf(draw: dict) -> bytes:
+    """The same draw laid out like the official result PDF (what parse_lottery_text expects)."""
+    prizes = draw["prizes"]
+    draw_date = datetime.strptime(draw["draw_date"], "%Y-%m-%d").strftime("%d/%m/%Y")
+    first = draw["first"]["ticket"]
+    lines = [
+        "KERALA STATE LOTTERIES - RESULT",
+        "EMAIL: cru.dir.lotteries@kerala.gov.in",
+        f"{draw['draw_name']} LOTTERY NO.{draw['draw_code']}th DRAW held on:- {draw_date},3:00 PM AT GORKY BHAVAN",
+        f"1st Prize Rs :10000000/-  1) {first} (KOLLAM)",
+        "Cons Prize-Rs :5000/-",
+        " ".join(prizes["consolation"]),
+    ]
+    for key, amount, _ in TIERS:
+        lines.append(f"{key} Prize Rs :{amount}/-")
+        numbers = prizes[key]
+        if key in ("2nd", "3rd"):
+            lines += [f"{i}) {ticket} (TVM)" for i, ticket in enumerate(numbers, 1)]
+        else:
+            lines += ["  ".join(numbers[i:i + 12]) for i in range(0, len(numbers), 12)]
+    lines.append("The prize winners are requested to verify the winning numbers with the Kerala Government Gazette")
+    boilerplate = [f"Boilerplate footer line {i} about claims and signatures." for i in range(60)]
+    # Results on one page (pages are joined without a separator), then footer pages
+    return _pdf_bytes([lines] + [boilerplate] * 3)
+
+
+def create_mock_upstream(base_url: str, api_delay: float = 0.15, pdf_delay: float = 0.4,
+                         api_stale: bool = False) -> FastAPI:
+    """
+    api_stale=True makes the API keep serving yesterday's draw, so every cron
+    round has to race it against the PDF.
+    """
+    mock = FastAPI()
+    today = datetime.now(IST)
+    draw = synthetic_draw(today, seed=44)
+    api_draw = synthetic_draw(today - timedelta(days=1), seed=43) if api_stale else draw
+    api_body = json.dumps(api_draw).encode()
+    api_etag = '"' + hashlib.sha256(api_body).hexdigest()[:16] + '"'
+    pdf = result_pdf(draw)
+
+    @mock.get("/wp-json/klr/v1/latest")
+    async def latest(request: Request):
+        await asyncio.sleep(api_delay)
+        if request.headers.get("if-none-match") == api_etag:
+            return Response(status_code=304, headers={"ETag": api_etag})
+        return Response(api_body, media_type="application/json", headers={"ETag": api_etag})
+
+    @mock.get("/wp-json/klr/v1/history")
+    async def history(limit: int = 10, offset: int = 0):
+        await asyncio.sleep(api_delay)
+        items = [synthetic_draw(today - timedelta(days=offset + i), seed=offset + i) for i in range(limit)]
+        return {"total": 3650, "items": items}
+
+    @mock.get("/kerala/results")
+    async def result_list():
+        await asyncio.sleep(pdf_delay / 2)
+        html = f'<table><tr><td>{draw["draw_name"]}</td><td><a href="{base_url}/kerala/result.pdf">View</a></td></tr></table>'
+        return Response(html, media_type="text/html")
+
+    @mock.get("/kerala/result.pdf")
+    async def result_file():
+        await asyncio.sleep(pdf_delay / 2)
+        return Response(pdf, media_type="application/pdf")
+
+    return mock
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--api-delay", type=float, default=0.15)
+    parser.add_argument("--pdf-delay", type=float, default=0.4)
+    parser.add_argument("--api-stale", action="store_true")
+    args = parser.parse_args()
+
+    import uvicorn
+    mock = create_mock_upstream(f"http://127.0.0.1:{args.port}", args.api_delay, args.pdf_delay, args.api_stale)
+    uvicorn.run(mock, host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,45 @@
+import asyncio
+import sys
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
 import os
 from app.routes import router
 from app.database import collection
+from app.indexes import ENSURE_INDEXES_ON_STARTUP, ensure_indexes
+from app.live import USE_CHANGE_STREAM, watch_change_stream
+from app.metrics import MetricsMiddleware
+from app.scheduler import start_scheduler, stop_scheduler
 
 load_dotenv()
 
+# 1. APP LIFESPAN: the results indexes in place before the first query, and the scrape scheduler.
+#    Nothing here imports the scraper stack; the upstream HTTP client is created by the first scrape.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if ENSURE_INDEXES_ON_STARTUP:
+        try:
+            await ensure_indexes()
+        except Exception as e:
+            print(f"⚠️ Index bootstrap skipped: {e}")
+
+    # Multi-worker live push: every worker tails the results change stream
+    watcher = asyncio.create_task(watch_change_stream(collection)) if USE_CHANGE_STREAM else None
+
+    # Adaptive in-process poller (replaces the request-driven cron outside Vercel)
+    start_scheduler()
+    yield
+    stop_scheduler()
+    if watcher:
+        watcher.cancel()
+    # Only loaded if this process scraped
+    http_client = sys.modules.get("app.http_client")
+    if http_client:
+        await http_client.close_client()
+
 # --- FASTAPI SETUP ---
-app = FastAPI(title="Kerala Lottery API")
+app = FastAPI(title="Kerala Lottery API", lifespan=lifespan)
 
 # 2. DYNAMIC CORS CONFIGURATION
 origins = [
@@ -26,11 +57,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cross-origin fetch() only sees safelisted headers; the cursor of /results?cursor=... paging is not one
+    expose_headers=["X-Next-Cursor"],
 )
+# 3. REQUEST METRICS (added last, so it is the outermost middleware and times CORS too)
+app.add_middleware(MetricsMiddleware)
 app.include_router(router, prefix="/api")
 
 if __name__ == "__main__":
     import uvicorn
-    # 3. DYNAMIC PORT SELECTION
+    # 4. DYNAMIC PORT SELECTION
     port = int(os.getenv("PORT", 8000))
     uvicorn.run(app, host="0.0.0.0", port=port)
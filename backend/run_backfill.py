@@ -0,0 +1,25 @@
+import argparse
+import asyncio
+from app.backfill import run_backfill, PAGE_SIZE, CONCURRENCY, REQUESTS_PER_SECOND
+from app.http_client import close_client
+
+async def main(args):
+    print("🚀 Backfilling lottery history from India Lottery API...")
+    try:
+        result = await run_backfill(
+            page_size=args.page_size,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            restart=args.restart
+        )
+    finally:
+        await close_client()
+    print(result)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load the full draw history into MongoDB")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=REQUESTS_PER_SECOND, help="max requests per second")
+    parser.add_argument("--restart", action="store_true", help="ignore the saved checkpoint")
+    asyncio.run(main(parser.parse_args()))
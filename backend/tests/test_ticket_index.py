@@ -0,0 +1,76 @@
+from app.ticket_index import (
+    build_ticket_index, lookup_ticket, match_tickets, parse_ticket_range
+)
+
+# Regular weekly draw: full tickets down to the 3rd prize, last 4 digits below
+WEEKLY = {
+    "1st Prize Rs :7500000/-": ["RH 700044"],
+    "Consolation Prize": ["RA 700044", "RB 700044"],
+    "2nd Prize Rs :500000/-": ["RC 123456"],
+    "3rd Prize Rs :100000/-": ["RD 654321"],
+    "4th Prize Rs :5000/-": ["0044", "1234"],
+    "5th Prize Rs :2000/-": ["4321"],
+    "6th Prize Rs :1000/-": ["0044"],
+}
+
+# Bumper draw: the 4th and 5th prizes are printed as full tickets too
+BUMPER = {
+    "1st Prize Rs :250000000/-": ["TH 577825"],
+    "Consolation Prize": ["TA 577825"],
+    "4th Prize Rs :500000/-": ["TB 993456", "TC 100001"],
+    "5th Prize Rs :200000/-": ["TD 222222"],
+    "6th Prize Rs :5000/-": ["3456", "7825"],
+}
+
+
+def test_bumper_full_tiers_match_only_the_exact_ticket():
+    index = build_ticket_index(BUMPER)
+
+    assert index["full"]["TB 993456"] == [4]
+    assert "3456" in index["suffix"] and 4 not in index["suffix"]["3456"]
+    assert lookup_ticket(index, "TB 993456") == [4, 6]
+    # Same last 4 digits, other ticket: only the suffix tier
+    assert lookup_ticket(index, "ZZ 993456") == [6]
+    assert lookup_ticket(index, "TB 100001") == []
+
+
+def test_weekly_suffix_tiers_match_any_series():
+    index = build_ticket_index(WEEKLY)
+
+    assert lookup_ticket(index, "XY 990044") == [4, 6]
+    assert lookup_ticket(index, "RC 123456") == [2]
+    assert lookup_ticket(index, "RC 123457") == []
+
+
+def test_consolation_ranks_after_first_prize():
+    index = build_ticket_index(WEEKLY)
+
+    assert lookup_ticket(index, "RH 700044") == [1, 4, 6]
+    assert lookup_ticket(index, "RA 700044") == [0, 4, 6]
+    assert lookup_ticket(build_ticket_index({**WEEKLY, "2nd Prize Rs :500000/-": ["RA 700044"]}),
+                         "RA 700044") == [0, 2, 4, 6]
+
+
+def test_parse_ticket_range_bounds():
+    assert parse_ticket_range("RH 700000-700999") == ("RH", 700000, 700999)
+    assert parse_ticket_range(" rh700000 - RH700999 ") == ("RH", 700000, 700999)
+    assert parse_ticket_range("RH 700044-700044") == ("RH", 700044, 700044)
+    assert parse_ticket_range("RH 000000-999999") == ("RH", 0, 999999)
+    # Reversed, short or malformed ranges are rejected, never expanded
+    assert parse_ticket_range("RH 700999-700000") is None
+    assert parse_ticket_range("RH 70000-700999") is None
+    assert parse_ticket_range("RH 700000") is None
+    assert parse_ticket_range("R1 700000-700999") is None
+
+
+def test_match_tickets_agrees_with_lookup_ticket():
+    tickets = {f"{series} {number:06d}" for series in ("RA", "RH", "TB", "ZZ")
+               for number in list(range(700000, 700100)) + [993456, 123456, 577825, 100001]}
+
+    for prizes in (WEEKLY, BUMPER):
+        index = build_ticket_index(prizes)
+        matches = match_tickets(index, tickets)
+
+        assert matches, "the batch should contain winners"
+        for ticket in tickets:
+            assert matches.get(ticket, []) == lookup_ticket(index, ticket), ticket
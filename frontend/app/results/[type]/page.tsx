@@ -18,7 +18,7 @@ async function getTypeHistory(type: string): Promise<LotteryDraw[]> {
 
   try {
     const res = await fetch(
-      `${API_BASE_URL}/api/results?name=${encodeURIComponent(formattedName)}`,
+      `${API_BASE_URL}/api/results?name=${encodeURIComponent(formattedName)}&summary=true`,
       { cache: "no-store" }
     );
     return res.ok ? await res.json() : [];
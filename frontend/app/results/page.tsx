@@ -5,7 +5,7 @@ async function getHubData() {
   try {
     const [resAll, resTypes] = await Promise.all([
       // Use the dynamic API_BASE_URL instead of the hardcoded IP
-      fetch(`${API_BASE_URL}/api/results`, { 
+      fetch(`${API_BASE_URL}/api/results?summary=true&limit=1`, { 
         next: { revalidate: 60 } 
       }),
       fetch(`${API_BASE_URL}/api/lottery-types`, { 
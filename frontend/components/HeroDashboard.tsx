@@ -11,27 +11,28 @@ export default function HeroDashboard({ initialData }: { initialData: any[] }) {
     </div>
   );
 
+  // The API sends each prize label's tier number and amount, so nothing is parsed from labels
+  type Tier = { tier: number | null; amount: number | null; label: string };
+  const tiers: Tier[] = latest?.tiers || [];
+  const labelOf = (list: Tier[], tier: number) => list.find(t => t.tier === tier)?.label || "";
+
   const formatCurrency = (label: string) => {
-    if (!label) return "---";
-    const match = label.match(/Rs\s?:?([\d,]+)/i);
-    if (!match) return "---";
-    const num = parseInt(match[1].replace(/,/g, ""));
+    const num = tiers.find(t => t.label === label)?.amount;
+    if (!num) return "---";
     if (num >= 10000000) return `₹${num / 10000000} Cr`;
     if (num >= 100000) return `₹${num / 100000} L`;
     return `₹${num.toLocaleString()}`;
   };
 
   const prizes = latest?.prizes || {};
-  const prizeKeys = Object.keys(prizes);
 
-  const firstPrizeLabel = prizeKeys.find(k => k.includes("1st")) || "";
-  const secondPrizeLabel = prizeKeys.find(k => k.includes("2nd")) || "";
-  const thirdPrizeLabel = prizeKeys.find(k => k.includes("3rd")) || "";
+  const firstPrizeLabel = labelOf(tiers, 1);
+  const secondPrizeLabel = labelOf(tiers, 2);
+  const thirdPrizeLabel = labelOf(tiers, 3);
 
   // Previous result helpers
   const prevPrizes = prev?.prizes || {};
-  const prevKeys = Object.keys(prevPrizes);
-  const prevFirstLabel = prevKeys.find(k => k.includes("1st")) || "";
+  const prevFirstLabel = labelOf(prev?.tiers || [], 1);
   const isUpcoming = latest?.is_upcoming;
 
   return (